@@ -0,0 +1,33 @@
+from .common import *
+
+# Settings for `manage.py benchmark` and local test runs: SQLite by default,
+# Postgres when DB_NAME (and the other DB_* variables) are set.
+
+SECRET_KEY = os.environ.get("SECRET_KEY", "benchmark-insecure-secret-key")
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["testserver", "localhost", "127.0.0.1"]
+
+if os.environ.get("DB_NAME"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql_psycopg2",
+            "NAME": os.environ["DB_NAME"],
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "localhost"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(BASE_DIR, "bench.sqlite3"),
+            # Large scales do not fit an in-memory test database
+            "TEST": {"NAME": os.path.join(BASE_DIR, "bench_test.sqlite3")},
+        }
+    }
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
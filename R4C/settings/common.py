@@ -29,11 +29,13 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "customers",
+    "helpers",
     "orders",
     "robots",
 ]
 
 MIDDLEWARE = [
+    "helpers.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -105,3 +107,132 @@ USE_TZ = True
 STATIC_URL = "/static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Batch robot ingestion (POST /api/robots/ with a JSON array or NDJSON body)
+
+ROBOT_BATCH_MAX_ITEMS = 10000
+
+ROBOT_BULK_CREATE_BATCH_SIZE = 1000
+
+# Excel reports are spooled in memory up to this size (bytes), then on disk
+
+REPORT_SPOOL_MAX_SIZE = 1024 * 1024
+
+# Production report cache (seconds). Ranges that end before today never
+# change; ranges that include today are also invalidated on robot_created.
+
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+REPORT_OPEN_CACHE_TIMEOUT = 60 * 5
+
+# Notification outbox, drained by `manage.py send_notifications`
+
+NOTIFICATION_BATCH_SIZE = 100
+
+# Messages sent over one SMTP connection before it is reopened
+
+NOTIFICATION_CHUNK_SIZE = 50
+
+NOTIFICATION_POLL_INTERVAL = 5
+
+NOTIFICATION_MAX_ATTEMPTS = 5
+
+NOTIFICATION_RETRY_DELAY = 30
+
+NOTIFICATION_RETRY_MAX_DELAY = 60 * 60
+
+# Seconds a worker holds the notifications it claimed; they are claimed again by
+# any worker once it expires, so it must exceed the time a batch takes to send
+
+NOTIFICATION_LEASE = 10 * 60
+
+# Threads available to async views for blocking work (transactions, files)
+
+BLOCKING_EXECUTOR_MAX_WORKERS = 8
+
+# Requests above these budgets are logged as warnings by RequestMetricsMiddleware
+
+REQUEST_QUERY_BUDGET = 50
+
+REQUEST_LATENCY_BUDGET = 1.0
+
+# Rows validated and inserted at once by the bulk customer import
+
+CUSTOMER_IMPORT_CHUNK_SIZE = 1000
+
+# Invalid rows of a customer import whose errors are reported; the rest are only counted
+
+CUSTOMER_IMPORT_MAX_ERRORS = 100
+
+# Known robot serials cache (seconds): how long a process trusts its own copy
+# of a known serial, and how long an unknown serial is remembered as such; 0
+# disables the latter, which is only safe with a cache shared by every process
+
+SERIAL_CACHE_LOCAL_TTL = 60
+
+SERIAL_CACHE_NEGATIVE_TTL = 0
+
+# Rows fetched per database round trip and encoded per chunk by the streaming exports
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Keyset-paginated list endpoints: default and maximum rows per page
+
+LIST_PAGE_SIZE = 100
+
+LIST_MAX_PAGE_SIZE = 1000
+
+# Report jobs: where rendered reports are kept, how often the worker polls for
+# new jobs (seconds) and the local time the weekly report is pre-rendered at
+
+REPORT_SNAPSHOT_DIR = os.environ.get(
+    "REPORT_SNAPSHOT_DIR", os.path.join(os.path.dirname(BASE_DIR), "reports")
+)
+
+REPORT_JOB_POLL_INTERVAL = 5
+
+# Seconds a worker holds a report job it claimed; a job still running after that
+# is assumed abandoned and claimed again
+
+REPORT_JOB_LEASE = 30 * 60
+
+# Seconds finished report jobs and their files are kept for, and seconds between
+# the report worker's prunes of older ones
+
+REPORT_JOB_RETENTION = 7 * 24 * 60 * 60
+
+REPORT_JOB_PRUNE_INTERVAL = 60 * 60
+
+WEEKLY_REPORT_TIME = "06:00"
+
+# Monthly partitions of the robots table created ahead of time by the
+# manage_robot_partitions command (PostgreSQL only)
+
+ROBOT_PARTITIONS_AHEAD = 3
+
+# Robot availability streams: events buffered per subscriber, seconds between
+# keepalive comments, maximum lifetime of a stream and of a long poll, and the
+# PostgreSQL NOTIFY channel relaying events across workers (off when empty)
+
+AVAILABILITY_QUEUE_SIZE = 100
+
+AVAILABILITY_KEEPALIVE = 15
+
+AVAILABILITY_STREAM_TIMEOUT = 300
+
+AVAILABILITY_POLL_TIMEOUT = 30
+
+AVAILABILITY_NOTIFY_CHANNEL = os.environ.get("AVAILABILITY_NOTIFY_CHANNEL", "")
+
+# Admin changelists count rows exactly only when PostgreSQL estimates fewer than this
+
+ADMIN_EXACT_COUNT_THRESHOLD = 10000
+
+# Idempotency-Key: seconds a response is replayed for, seconds an async request
+# holds its key while the view runs, and seconds between purges of expired keys
+
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+
+IDEMPOTENCY_PURGE_INTERVAL = 60 * 60
@@ -6,7 +6,9 @@ SECRET_KEY = os.environ["SECRET_KEY"]
 
 DEBUG = False
 
-ALLOWED_HOSTS: List = []
+ALLOWED_HOSTS: List = [
+    host for host in os.environ.get("ALLOWED_HOSTS", "").split(",") if host
+]
 
 DATABASES = {
     "default": {
@@ -16,5 +18,37 @@ DATABASES = {
         "PASSWORD": os.environ["DB_PASSWORD"],
         "HOST": os.environ["DB_HOST"],
         "PORT": os.environ["DB_PORT"],
+        # Keep connections open between requests instead of paying the TCP and
+        # authentication handshake on every request, and check them before reuse.
+        # Every worker thread holds one, so workers * threads must stay below
+        # the server's max_connections.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
+
+# Under ASGI every request runs its ORM calls in a different executor thread,
+# so persistent connections are opened per thread and never reused; close them
+# after each request and pool them with PgBouncer instead.
+if os.environ.get("GUNICORN_WORKER_CLASS") == "uvicorn.workers.UvicornWorker":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Connection pooling is delegated to PgBouncer: point DB_HOST and DB_PORT at it
+# and set DB_PGBOUNCER. In transaction pooling mode server-side cursors, which
+# QuerySet.iterator() uses, must be disabled.
+if os.environ.get("DB_PGBOUNCER"):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Reports and other cached results must be shared between workers, so that
+# invalidating them reaches every worker; docker-compose runs Redis for this.
+# Without REDIS_URL every worker process has its own local memory cache and
+# only sees its own invalidations, which is only correct with a single worker.
+# Unknown robot serials are only cached in a shared cache.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+    SERIAL_CACHE_NEGATIVE_TTL = 60
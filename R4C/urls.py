@@ -16,8 +16,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from helpers.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics/", metrics),
     path("", include("robots.urls")),
     path("", include("orders.urls")),
     path("", include("customers.urls")),
@@ -1,3 +1,19 @@
 from django.contrib import admin
 
+from helpers.admin import LargeTableAdmin
+from .models import Customer, normalize_email
+
 # Register your models here.
+
+
+@admin.register(Customer)
+class CustomerAdmin(LargeTableAdmin):
+    list_display = ["id", "email"]
+    # An exact match on the stored form uses the unique index
+    search_fields = ["email__lower__exact"]
+    ordering = ["-id"]
+
+    def get_search_results(self, request, queryset, search_term):
+        return super().get_search_results(
+            request, queryset, normalize_email(search_term)
+        )
@@ -1,8 +1,5 @@
-from django import forms
+from helpers.schemas import Schema
 from .models import Customer
 
 
-class CustomerForm(forms.ModelForm):
-    class Meta:
-        model = Customer
-        fields = ["email"]
+CUSTOMER_SCHEMA = Schema.for_model(Customer, ["email"])
@@ -0,0 +1,106 @@
+import csv
+import json
+from itertools import islice
+
+from .forms import CUSTOMER_SCHEMA
+from .models import Customer, normalize_email
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def parse_rows(lines, file_format):
+    """
+    Parse an import file lazily, one row at a time.
+
+    CSV files need a header row with an ``email`` column; NDJSON files hold
+    one JSON object with an ``email`` key per line.
+
+    Args:
+        lines (Iterable[str]): The lines of the file.
+        file_format (str): ``"csv"`` or ``"ndjson"``.
+
+    Yields:
+        tuple: ``(row number, email, errors)`` where either ``email`` or ``errors`` is None.
+    """
+
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            email = row.get("email")
+            if email is None:
+                yield reader.line_num, None, ["Missing email column."]
+            else:
+                yield reader.line_num, email.strip(), None
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None, ["Invalid JSON."]
+            continue
+        if not isinstance(data, dict) or "email" not in data:
+            yield number, None, ["Missing required field: email."]
+        else:
+            yield number, data["email"], None
+
+
+def import_customers(rows, chunk_size=1000, max_errors=100) -> dict:
+    """
+    Create customers from parsed rows, one chunk at a time.
+
+    Emails are validated with the ``CUSTOMER_SCHEMA`` rules and normalized to
+    lower case. Every chunk costs
+    one query to find the emails that already exist and one bulk insert for
+    the new ones, and only one chunk is held in memory at a time. Invalid
+    rows are all counted, but only the errors of the first ``max_errors`` are
+    kept, so a file of garbage does not fill memory with errors.
+
+    Args:
+        rows (Iterable[tuple]): Rows as produced by ``parse_rows``.
+        chunk_size (int): The number of rows handled per chunk.
+        max_errors (int): The number of invalid rows whose errors are reported.
+
+    Returns:
+        dict: The number of rows read, customers created, duplicates skipped
+        and invalid rows, and the errors of the first invalid rows.
+    """
+
+    clean_email = CUSTOMER_SCHEMA.rules["email"]
+    report = {"rows": 0, "created": 0, "duplicates": 0, "error_count": 0, "errors": []}
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return report
+
+        report["rows"] += len(chunk)
+        emails = {}
+        for number, email, error in chunk:
+            if error is None:
+                email, message = clean_email(email)
+                if message is None:
+                    email = normalize_email(email)
+                else:
+                    error = [message]
+            if error is not None:
+                report["error_count"] += 1
+                if len(report["errors"]) < max_errors:
+                    report["errors"].append({"row": number, "errors": error})
+            elif email in emails:
+                report["duplicates"] += 1
+            else:
+                emails[email] = number
+
+        existing = set(
+            Customer.objects.filter(email__lower__in=emails).values_list("email", flat=True)
+        )
+        # Conflicts can only come from customers registered concurrently
+        Customer.objects.bulk_create(
+            (Customer(email=email) for email in emails if email not in existing),
+            ignore_conflicts=True,
+        )
+        report["created"] += len(emails) - len(existing)
+        report["duplicates"] += len(existing)
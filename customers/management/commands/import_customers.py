@@ -0,0 +1,46 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from customers.imports import IMPORT_FORMATS, import_customers, parse_rows
+
+
+class Command(BaseCommand):
+    help = "Import customers from a CSV (with an email column) or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the file to import.")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows validated and inserted at once.",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=settings.CUSTOMER_IMPORT_MAX_ERRORS,
+            help="Number of invalid rows whose errors are reported.",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or os.path.splitext(options["path"])[1][1:]
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(
+                f"Unknown format {file_format!r}, pass --format {' or '.join(IMPORT_FORMATS)}."
+            )
+
+        with open(options["path"], newline="", encoding="utf-8") as file:
+            report = import_customers(
+                parse_rows(file, file_format),
+                chunk_size=options["chunk_size"],
+                max_errors=options["max_errors"],
+            )
+        self.stdout.write(json.dumps(report, indent=2))
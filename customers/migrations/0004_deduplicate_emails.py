@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Count, Min
+from django.db.models.functions import Lower, Trim
+
+
+def deduplicate_emails(apps, schema_editor):
+    """
+    Merge customers whose normalized emails are equal into the oldest one.
+
+    Emails are normalized like ``normalize_email``. Orders and waitlist
+    entries of the duplicates are moved to the kept customer before the
+    duplicates are deleted, then all emails are normalized.
+    """
+
+    Customer = apps.get_model("customers", "Customer")
+    Order = apps.get_model("orders", "Order")
+    WaitlistedOrder = apps.get_model("orders", "WaitlistedOrder")
+
+    customers = Customer.objects.annotate(normalized=Lower(Trim("email")))
+    duplicated = (
+        customers.values("normalized")
+        .annotate(keep=Min("id"), count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("normalized", "keep")
+    )
+    for normalized, keep in duplicated.iterator():
+        duplicates = list(
+            customers.filter(normalized=normalized)
+            .exclude(id=keep)
+            .values_list("id", flat=True)
+        )
+        Order.objects.filter(customer_id__in=duplicates).update(customer_id=keep)
+        WaitlistedOrder.objects.filter(customer_id__in=duplicates).update(
+            customer_id=keep
+        )
+        Customer.objects.filter(id__in=duplicates).delete()
+
+    Customer.objects.update(email=Lower(Trim("email")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_alter_customer_email'),
+        ('orders', '0005_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:17
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('customers', '0005_unique_email'),
+        ('customers', '0006_email_lower_unique'),
+    ]
+
+    dependencies = [
+        ('customers', '0004_deduplicate_emails'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='customer',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='customer_email_lower_uniq'),
+        ),
+    ]
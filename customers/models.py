@@ -1,5 +1,74 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import connections, models, router
+from django.db.models.functions import Lower
+
+
+def normalize_email(email) -> str:
+    """Return the form emails are stored in, so they are unique regardless of case."""
+
+    return email.strip().lower()
+
+
+class CustomerManager(models.Manager):
+    def upsert(self, email) -> tuple:
+        """
+        Return the customer with an email, creating it if it does not exist.
+
+        The customer is inserted with a single
+        ``INSERT ... ON CONFLICT (LOWER(email)) DO NOTHING RETURNING id``
+        statement against the ``customer_email_lower_uniq`` constraint, so
+        concurrent or retried calls never create duplicates nor fail, and a new
+        customer's id comes back in one round-trip; an existing one is then
+        read by the same index. ``bulk_create(ignore_conflicts=True)`` does not
+        return primary keys before Django 5.0.
+
+        Args:
+            email (str): The normalized email.
+
+        Returns:
+            tuple: The new or existing customer, and whether it was created.
+        """
+
+        connection = connections[router.db_for_write(self.model)]
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.model._meta.db_table)
+        column = quote_name(self.model._meta.get_field("email").column)
+        pk = quote_name(self.model._meta.pk.column)
+        with connection.cursor() as cursor:
+            # The existing customer may be deleted in between; insert it again then
+            while True:
+                cursor.execute(
+                    f"INSERT INTO {table} ({column}) VALUES (%s) "
+                    f"ON CONFLICT (LOWER({column})) DO NOTHING RETURNING {pk}",
+                    [email],
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    return self.model(pk=row[0], email=email), True
+
+                cursor.execute(
+                    f"SELECT {pk}, {column} FROM {table} WHERE LOWER({column}) = %s",
+                    [email],
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    return self.model(pk=row[0], email=row[1]), False
+
+    async def aupsert(self, email) -> tuple:
+        return await sync_to_async(self.upsert)(email)
 
 
 class Customer(models.Model):
     email = models.EmailField(max_length=255, blank=False, null=False)
+
+    objects = CustomerManager()
+
+    class Meta:
+        constraints = [
+            # Emails are unique regardless of case; look them up with
+            # email__lower, which uses this index
+            models.UniqueConstraint(Lower("email"), name="customer_email_lower_uniq")
+        ]
+
+
+Customer._meta.get_field("email").register_lookup(Lower)
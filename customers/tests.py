@@ -1,3 +1,186 @@
-from django.test import TestCase
+from importlib import import_module
+
+from django.apps import apps
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+
+from orders.models import Order
+from .imports import import_customers, parse_rows
+from .models import Customer
 
 # Create your tests here.
+
+
+class PostCustomerTests(TestCase):
+    def post_customer(self, email):
+        return self.client.post(
+            "/api/customers/", {"email": email}, content_type="application/json"
+        )
+
+    def test_existing_email_returns_the_customer_regardless_of_case(self):
+        created = self.post_customer("Customer@Example.com")
+        existing = self.post_customer("customer@example.COM")
+
+        customer = Customer.objects.get()
+        self.assertEqual(customer.email, "customer@example.com")
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(
+            created.json(), {"message": f"New customer added with id: {customer.id}"}
+        )
+        self.assertEqual(existing.status_code, 200)
+        self.assertEqual(
+            existing.json(),
+            {"message": f"Customer already exists with id: {customer.id}"},
+        )
+
+    def test_emails_differing_in_case_cannot_be_stored(self):
+        Customer.objects.create(email="customer@example.com")
+
+        with self.assertRaises(IntegrityError):
+            Customer.objects.create(email="Customer@example.com")
+
+
+class DeduplicateEmailsMigrationTests(TestCase):
+    def test_emails_are_normalized_like_normalize_email(self):
+        migration = import_module("customers.migrations.0004_deduplicate_emails")
+        kept = Customer.objects.create(email="customer@example.com")
+        duplicate = Customer.objects.create(email=" Customer@Example.com ")
+        other = Customer.objects.create(email=" Other@Example.com")
+        order = Order.objects.create(customer=duplicate, robot_serial="R2-D2")
+
+        migration.deduplicate_emails(apps, None)
+
+        self.assertEqual(
+            dict(Customer.objects.values_list("id", "email")),
+            {kept.id: "customer@example.com", other.id: "other@example.com"},
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.customer_id, kept.id)
+
+
+class ImportCustomersTests(TestCase):
+    def test_only_the_first_errors_are_kept(self):
+        lines = ["email", "customer@example.com"] + ["not an email"] * 5
+
+        report = import_customers(parse_rows(lines, "csv"), chunk_size=3, max_errors=2)
+
+        self.assertEqual(report["rows"], 6)
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["error_count"], 5)
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4])
+
+
+@override_settings(CUSTOMER_IMPORT_CHUNK_SIZE=2)
+class PostCustomerImportTests(TestCase):
+    url = "/api/customers/import/"
+
+    def setUp(self):
+        Customer.objects.create(email="existing@example.com")
+
+    def post(self, body, content_type, query=""):
+        return self.client.post(f"{self.url}{query}", body, content_type=content_type)
+
+    def emails(self):
+        return set(Customer.objects.values_list("email", flat=True))
+
+    def test_imports_a_csv_body(self):
+        body = (
+            "\ufeffemail,name\r\n"
+            "First@Example.com,First\r\n"
+            " first@example.com ,Again\r\n"
+            "EXISTING@example.com,Existing\r\n"
+            "not an email,Invalid\r\n"
+            "second@example.com,Second\r\n"
+        ).encode()
+
+        response = self.post(body, "text/csv")
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(
+            {key: report[key] for key in ("rows", "created", "duplicates", "error_count")},
+            {"rows": 5, "created": 2, "duplicates": 2, "error_count": 1},
+        )
+        self.assertEqual([error["row"] for error in report["errors"]], [5])
+        self.assertEqual(
+            self.emails(),
+            {"existing@example.com", "first@example.com", "second@example.com"},
+        )
+
+    def test_imports_an_ndjson_body(self):
+        body = (
+            '\ufeff{"email": "first@example.com"}\n'
+            "\n"
+            '{"email": "existing@example.com"}\n'
+            "{not json\n"
+            '{"name": "No email"}\n'
+        ).encode()
+
+        response = self.post(body, "application/x-ndjson")
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report["rows"], report["created"], report["duplicates"]), (4, 1, 1))
+        self.assertEqual(
+            report["errors"],
+            [
+                {"row": 4, "errors": ["Invalid JSON."]},
+                {"row": 5, "errors": ["Missing required field: email."]},
+            ],
+        )
+        self.assertEqual(self.emails(), {"existing@example.com", "first@example.com"})
+
+    def test_imports_a_multipart_upload(self):
+        upload = SimpleUploadedFile("customers.csv", b"email\nfirst@example.com\n")
+
+        response = self.client.post(self.url, {"file": upload})
+
+        self.assertEqual(response.json()["created"], 1)
+        self.assertIn("first@example.com", self.emails())
+
+    def test_format_query_parameter_wins(self):
+        response = self.post(b"email\nfirst@example.com\n", "text/plain", "?format=csv")
+
+        self.assertEqual(response.json()["created"], 1)
+
+    def test_rejects_invalid_uploads(self):
+        self.assertEqual(self.post(b"", "text/csv", "?format=xlsx").status_code, 400)
+        self.assertEqual(
+            self.post("email\nfirst@example.com\n".encode("utf-16"), "text/csv").json(),
+            {"message": "The file must be UTF-8 encoded."},
+        )
+        self.assertEqual(self.client.post(self.url, {}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.emails(), {"existing@example.com"})
+
+
+class ListCustomerOrdersTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="customer@example.com")
+        other = Customer.objects.create(email="other@example.com")
+        self.ids = []
+        for serial in ["R2-D2", "C3-PO", "X5-LT"]:
+            self.ids.append(Order.objects.create(customer=self.customer, robot_serial=serial).id)
+            Order.objects.create(customer=other, robot_serial=serial)
+        self.url = f"/api/customers/{self.customer.id}/orders/"
+
+    def test_cursors_walk_through_the_customer_orders(self):
+        first = self.client.get(self.url, {"limit": 2}).json()
+        last = self.client.get(self.url, {"limit": 2, "after": first["next"]}).json()
+
+        self.assertEqual(first["next"], self.ids[1])
+        self.assertEqual(
+            [order["id"] for order in first["results"] + last["results"]], self.ids
+        )
+        self.assertIsNone(last["next"])
+        self.assertEqual(
+            {order["customer_id"] for order in first["results"] + last["results"]},
+            {self.customer.id},
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"after": "next"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"message": "after and limit must be integers."})
@@ -1,4 +1,9 @@
 from django.urls import path
 from . import views
 
-urlpatterns = [path("api/customers/", views.post_customer)]
+urlpatterns = [
+    path("api/customers/", views.post_customer),
+    path("api/customers/import/", views.post_customer_import),
+    path("api/async/customers/", views.apost_customer),
+    path("api/customers/<int:customer_id>/orders/", views.list_customer_orders),
+]
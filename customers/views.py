@@ -1,44 +1,167 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+import codecs
 import json
 
-from helpers.helpers import validate_json_data
-from .forms import CustomerForm
+from helpers.helpers import async_csrf_exempt
+from helpers.pagination import keyset_page
+from helpers.serialization import loads
+from helpers.idempotency import idempotent
+from orders.models import Order
+from orders.views import ORDER_EXPORT_FIELDS
+from .forms import CUSTOMER_SCHEMA
+from .imports import IMPORT_FORMATS, import_customers, parse_rows
+from .models import Customer, normalize_email
 
 
-def create_customer_instance(data) -> CustomerForm:
-    order_data = {"email": data["email"]}
-    return CustomerForm(order_data)
+def customer_response(customer, created) -> JsonResponse:
+    if created:
+        response = {"message": f"New customer added with id: {customer.id}"}
+        return JsonResponse(response, status=201)
+    response = {"message": f"Customer already exists with id: {customer.id}"}
+    return JsonResponse(response, status=200)
 
 
 @method_decorator(csrf_exempt, name="dispatch")
+@idempotent
 def post_customer(request) -> JsonResponse:
+    """
+    View function for registering a customer via HTTP POST request.
+
+    Emails are unique regardless of case, and posting an email that is
+    already registered returns the id of the existing customer with a 200
+    response instead of 201, so retried requests never create duplicates.
+
+    Retries sent with the same ``Idempotency-Key`` header get the first
+    response back without running the view again; see
+    ``helpers.idempotency.idempotent``.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: A JSON response containing the result of the operation.
+    """
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            required_fields = {"email"}
-            missing_fields = validate_json_data(data, required_fields)
-
-            if missing_fields:
-                missing_fields_list = ", ".join(missing_fields)
-                response = {
-                    "message": f"Missing required field(s) in JSON data: {missing_fields_list}"
-                }
-                return JsonResponse(response, status=400)
-
-            form = create_customer_instance(data)
-            if form.is_valid():
-                customer = form.save()
-                response = {"message": f"New customer added with id: {customer.id}"}
-                return JsonResponse(response, status=201)
-            else:
-                errors = form.errors
-                response = {"message": "Validation error", "errors": errors}
-                return JsonResponse(response, status=400)
+            data, error = CUSTOMER_SCHEMA.validate(loads(request.body))
+            if error is not None:
+                return JsonResponse(error, status=400)
+
+            customer, created = Customer.objects.upsert(normalize_email(data["email"]))
+            return customer_response(customer, created)
         except json.JSONDecodeError:
             response = {"message": "Invalid JSON format in the request body."}
             return JsonResponse(response, status=400)
     else:
         response = {"message": "Invalid request."}
         return JsonResponse(response, status=400)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+def post_customer_import(request) -> JsonResponse:
+    """
+    View function for importing customers in bulk from a CSV or NDJSON upload.
+
+    The file is either the request body itself or the ``file`` field of a
+    multipart upload. Its format is taken from the ``format`` query parameter
+    (``csv`` or ``ndjson``), or else from the content type or file name. The
+    file is read line by line and imported in chunks, so memory use does not
+    grow with its size.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: The import report, with the number of invalid rows and
+        the errors of the first ``CUSTOMER_IMPORT_MAX_ERRORS`` of them.
+    """
+    if request.method != "POST":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    if request.content_type == "multipart/form-data":
+        upload = request.FILES.get("file")
+        if upload is None:
+            response = {"message": "Missing required file: file"}
+            return JsonResponse(response, status=400)
+        source, name = upload, upload.name
+    else:
+        source, name = request, ""
+
+    file_format = request.GET.get("format")
+    if file_format is None:
+        if name.endswith(".csv") or request.content_type == "text/csv":
+            file_format = "csv"
+        else:
+            file_format = "ndjson"
+    if file_format not in IMPORT_FORMATS:
+        formats = ", ".join(IMPORT_FORMATS)
+        response = {"message": f"Unsupported format, expected one of: {formats}"}
+        return JsonResponse(response, status=400)
+
+    # Spreadsheet exports often start with a byte order mark
+    lines = codecs.iterdecode(source, "utf-8-sig")
+    try:
+        report = import_customers(
+            parse_rows(lines, file_format),
+            chunk_size=settings.CUSTOMER_IMPORT_CHUNK_SIZE,
+            max_errors=settings.CUSTOMER_IMPORT_MAX_ERRORS,
+        )
+    except UnicodeDecodeError:
+        response = {"message": "The file must be UTF-8 encoded."}
+        return JsonResponse(response, status=400)
+    return JsonResponse(report, status=200)
+
+
+@async_csrf_exempt
+@idempotent
+async def apost_customer(request) -> JsonResponse:
+    """
+    Async counterpart of ``post_customer`` for ASGI servers.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: A JSON response containing the result of the operation.
+    """
+    if request.method != "POST":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    try:
+        data = loads(request.body)
+    except json.JSONDecodeError:
+        response = {"message": "Invalid JSON format in the request body."}
+        return JsonResponse(response, status=400)
+
+    data, error = CUSTOMER_SCHEMA.validate(data)
+    if error is not None:
+        return JsonResponse(error, status=400)
+
+    customer, created = await Customer.objects.aupsert(normalize_email(data["email"]))
+    return customer_response(customer, created)
+
+
+def list_customer_orders(request, customer_id) -> HttpResponse:
+    """
+    View function for listing the orders of a customer, one page at a time.
+
+    See ``helpers.pagination.keyset_page`` for the query parameters.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        customer_id (int): The id of the customer.
+
+    Returns:
+        HttpResponse: A page of the customer's orders, ordered by id.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    orders = Order.objects.filter(customer_id=customer_id)
+    return keyset_page(request, orders, ORDER_EXPORT_FIELDS)
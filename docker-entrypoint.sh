@@ -6,4 +6,14 @@ poetry run python manage.py migrate
 
 # Start server
 echo "Starting server"
-poetry run python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+case "$DJANGO_SETTINGS_MODULE" in
+    R4C.settings.prod)
+        if [ "$GUNICORN_WORKER_CLASS" = "uvicorn.workers.UvicornWorker" ]; then
+            exec poetry run gunicorn R4C.asgi:application
+        fi
+        exec poetry run gunicorn R4C.wsgi:application
+        ;;
+    *)
+        exec poetry run python manage.py runserver 0.0.0.0:8000
+        ;;
+esac
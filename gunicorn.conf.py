@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration of the production serving profile.
+
+Serves ``R4C.wsgi:application`` with sync workers by default. Set
+``GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker`` and serve
+``R4C.asgi:application`` to run the async endpoints on an event loop.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+# Sync workers block on the database, so run more of them than cores;
+# event loop workers do not, one per core is enough.
+workers = int(
+    os.environ.get(
+        "WEB_CONCURRENCY",
+        multiprocessing.cpu_count() * 2 + 1
+        if worker_class == "sync"
+        else multiprocessing.cpu_count(),
+    )
+)
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth; the jitter keeps them
+# from restarting all at once.
+max_requests = 1000
+
+max_requests_jitter = 100
+
+accesslog = "-"
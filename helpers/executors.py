@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide executor for blocking work done by async views.
+
+    The pool is bounded by ``BLOCKING_EXECUTOR_MAX_WORKERS``, which also bounds
+    the number of database connections async views can hold at once.
+    """
+
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BLOCKING_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="blocking",
+        )
+    return _executor
+
+
+def call_with_connections(func, *args, **kwargs):
+    # Executor threads outlive requests, so their connections are recycled
+    # the same way Django does at the start and end of every request.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking function (ORM transaction, mail, openpyxl) without blocking the event loop.
+
+    Args:
+        func (callable): The blocking function.
+        *args: Positional arguments for ``func``.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        The return value of ``func``.
+    """
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(
+        context.run, call_with_connections, func, *args, **kwargs
+    )
+    return await loop.run_in_executor(get_executor(), call)
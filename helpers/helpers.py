@@ -1,5 +1,90 @@
+from django.db import connections, router
+
+from .serialization import loads
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson"}
+
+
+def async_csrf_exempt(view):
+    """
+    Mark an async view function as being exempt from the CSRF view protection.
+
+    Django's ``csrf_exempt`` wraps views in a sync function, which would make
+    Django run a coroutine function as a sync view.
+    """
+
+    view.csrf_exempt = True
+    return view
 
 
 def validate_json_data(data, required_fields):
     missing_fields = required_fields - set(data.keys())
     return missing_fields
+
+
+def load_json_body(request):
+    """
+    Parse the body of a JSON request.
+
+    NDJSON bodies (one JSON value per line, sent with an NDJSON content type)
+    are returned as a list, the same way a JSON array is.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        dict | list: The parsed JSON data.
+
+    Raises:
+        json.JSONDecodeError: If the body (or any NDJSON line) is not valid JSON.
+    """
+
+    if request.content_type in NDJSON_CONTENT_TYPES:
+        return [loads(line) for line in request.body.splitlines() if line.strip()]
+    return loads(request.body)
+
+
+def increment_or_create_many(model, fields, field, amounts, batch_size=500) -> None:
+    """
+    Atomically add amounts to the counter column of many rows, creating missing ones.
+
+    The rows are written with one
+    ``INSERT ... ON CONFLICT (fields) DO UPDATE SET field = field + amount``
+    statement per ``batch_size`` rows, in key order so that concurrent
+    writers lock the rows they share in the same order.
+
+    Args:
+        model (Model): The model holding the counter.
+        fields (list[str]): Fields identifying a row; must be unique together.
+        field (str): The name of the counter field.
+        amounts (Mapping[tuple, int]): The amount to add per tuple of ``fields`` values.
+        batch_size (int): The number of rows written per statement.
+    """
+
+    opts = model._meta
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    table = quote_name(opts.db_table)
+    key_fields = [opts.get_field(name) for name in fields]
+    columns = [quote_name(key_field.column) for key_field in key_fields]
+    counter = quote_name(opts.get_field(field).column)
+    placeholders = "({})".format(", ".join(["%s"] * (len(fields) + 1)))
+
+    rows = sorted(amounts.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for key, amount in batch:
+                params.extend(
+                    key_field.get_db_prep_save(value, connection)
+                    for key_field, value in zip(key_fields, key)
+                )
+                params.append(amount)
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}, {counter}) "
+                f"VALUES {', '.join([placeholders] * len(batch))} "
+                f"ON CONFLICT ({', '.join(columns)}) DO UPDATE SET "
+                f"{counter} = {table}.{counter} + EXCLUDED.{counter}",
+                params,
+            )
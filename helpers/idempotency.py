@@ -0,0 +1,258 @@
+import functools
+import hashlib
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .executors import run_blocking
+from .models import IdempotencyKey
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+def fingerprint(request) -> str:
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def check_key(request):
+    """
+    Read the ``Idempotency-Key`` header of a POST request.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        tuple: The key, or None when the request is not idempotent, and an
+        error response, or None when the key is acceptable.
+    """
+
+    key = request.headers.get("Idempotency-Key")
+    if request.method != "POST" or key is None:
+        return None, None
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        response = {
+            "message": "Idempotency-Key must be 1 to "
+            f"{IDEMPOTENCY_KEY_MAX_LENGTH} characters long."
+        }
+        return None, JsonResponse(response, status=400)
+    return key, None
+
+
+def should_store(response) -> bool:
+    # Server errors and streams are not replayed; the retry runs the view again
+    return not response.streaming and response.status_code < 500
+
+
+def claim_key(request, key, lease):
+    """
+    Insert the row of a key unless another request already holds it.
+
+    The row is written with a single ``INSERT ... ON CONFLICT (path, key)``
+    statement that only overwrites an expired row, so of several requests
+    sent with the same key exactly one claims it. Inside a transaction, a
+    concurrent insert of the same key waits on PostgreSQL until that
+    transaction ends.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        key (str): The ``Idempotency-Key`` header.
+        lease (int): Seconds the claim is held for until a response is stored.
+
+    Returns:
+        int | None: The id of the claimed row, or None if the key is taken.
+    """
+
+    opts = IdempotencyKey._meta
+    connection = connections[router.db_for_write(IdempotencyKey)]
+    quote_name = connection.ops.quote_name
+    table = quote_name(opts.db_table)
+    column = {
+        field.name: quote_name(field.column) for field in opts.concrete_fields
+    }
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({column['path']}, {column['key']}, "
+            f"{column['fingerprint']}, {column['status']}, {column['content_type']}, "
+            f"{column['content']}, {column['expires_at']}) "
+            "VALUES (%s, %s, %s, NULL, '', NULL, %s) "
+            f"ON CONFLICT ({column['path']}, {column['key']}) DO UPDATE SET "
+            f"{column['fingerprint']} = EXCLUDED.{column['fingerprint']}, "
+            f"{column['status']} = NULL, {column['content_type']} = '', "
+            f"{column['content']} = NULL, "
+            f"{column['expires_at']} = EXCLUDED.{column['expires_at']} "
+            f"WHERE {table}.{column['expires_at']} < %s "
+            f"RETURNING {column['id']}",
+            [
+                request.path,
+                key,
+                fingerprint(request),
+                connection.ops.adapt_datetimefield_value(now + timedelta(seconds=lease)),
+                connection.ops.adapt_datetimefield_value(now),
+            ],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def store_response(key_id, request, response) -> None:
+    """
+    Keep the response to a claimed key for ``IDEMPOTENCY_KEY_TTL`` seconds.
+
+    Responses that are not replayed release the key instead.
+
+    Args:
+        key_id (int): The id of the claimed row.
+        request (HttpRequest): The HTTP request object.
+        response (HttpResponse): The response of the view.
+    """
+
+    rows = IdempotencyKey.objects.filter(id=key_id)
+    if not should_store(response):
+        rows.delete()
+        return
+
+    rows.update(
+        status=response.status_code,
+        content_type=response["Content-Type"],
+        content=response.content,
+        expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+    )
+
+
+def release_key(key_id) -> None:
+    IdempotencyKey.objects.filter(id=key_id).delete()
+
+
+def replay(request, stored) -> HttpResponse:
+    """
+    Rebuild a stored response for a retried request.
+
+    Args:
+        request (HttpRequest): The retried request.
+        stored (IdempotencyKey): The row stored for the first request.
+
+    Returns:
+        HttpResponse: The original response, or 422 if the key was first used
+        with a different body.
+    """
+
+    if stored.fingerprint != fingerprint(request):
+        response = {
+            "message": "Idempotency-Key was already used with a different request."
+        }
+        return JsonResponse(response, status=422)
+
+    response = HttpResponse(
+        stored.content,
+        status=stored.status,
+        content_type=stored.content_type,
+    )
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def in_progress() -> JsonResponse:
+    response = {"message": "A request with this Idempotency-Key is in progress."}
+    return JsonResponse(response, status=409)
+
+
+def stored_response(request, key) -> HttpResponse:
+    """
+    Answer a request whose key is taken.
+
+    Args:
+        request (HttpRequest): The retried request.
+        key (str): The ``Idempotency-Key`` header.
+
+    Returns:
+        HttpResponse: The replayed response, or 409 while the first request
+        is still in progress.
+    """
+
+    stored = IdempotencyKey.objects.filter(path=request.path, key=key).first()
+    if stored is None or stored.status is None:
+        return in_progress()
+    return replay(request, stored)
+
+
+def purge_expired_keys() -> int:
+    """
+    Delete the keys whose response is no longer replayed.
+
+    Returns:
+        int: The number of deleted keys.
+    """
+
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
+
+
+def idempotent(view):
+    """
+    Deduplicate retried POST requests that carry an ``Idempotency-Key`` header.
+
+    The first request to a key claims it with ``claim_key`` and its response
+    is stored in the ``IdempotencyKey`` table for ``IDEMPOTENCY_KEY_TTL``
+    seconds. A retry with the same key replays it without running the view,
+    so no rows are inserted and no signals are sent again. Keys are scoped to
+    the request path, and reusing one with a different body gets 422.
+
+    Sync views run in the transaction that claims the key, so the key and the
+    rows the view writes are committed together, and a concurrent duplicate
+    waits for them and replays the response. Async views cannot share their
+    transaction: the key is claimed for ``IDEMPOTENCY_LOCK_TIMEOUT`` seconds
+    before the view runs, and concurrent duplicates get 409 Conflict.
+
+    Requests without the header are not affected.
+
+    Args:
+        view (callable): The view function.
+
+    Returns:
+        callable: The wrapped view.
+    """
+
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            key, error = check_key(request)
+            if key is None:
+                return error or await view(request, *args, **kwargs)
+
+            lease = settings.IDEMPOTENCY_LOCK_TIMEOUT
+            key_id = await run_blocking(claim_key, request, key, lease)
+            if key_id is None:
+                return await run_blocking(stored_response, request, key)
+
+            try:
+                response = await view(request, *args, **kwargs)
+            except Exception:
+                await run_blocking(release_key, key_id)
+                raise
+            await run_blocking(store_response, key_id, request, response)
+            return response
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key, error = check_key(request)
+        if key is None:
+            return error or view(request, *args, **kwargs)
+
+        with transaction.atomic():
+            key_id = claim_key(request, key, settings.IDEMPOTENCY_KEY_TTL)
+            if key_id is None:
+                return stored_response(request, key)
+
+            response = view(request, *args, **kwargs)
+            store_response(key_id, request, response)
+        return response
+
+    return wrapper
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from helpers.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key responses, repeating at a fixed interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.IDEMPOTENCY_PURGE_INTERVAL,
+            help="Seconds to wait between purges.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Purge once and exit instead of repeating.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                deleted = purge_expired_keys()
+                self.stdout.write(f"Purged {deleted} expired idempotency keys")
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
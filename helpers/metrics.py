@@ -0,0 +1,161 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """A monotonically increasing counter, exported in Prometheus text format."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """A cumulative histogram, exported in Prometheus text format."""
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total, count = self.series.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.series[key] = (counts, total + value, count + 1)
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = format_labels(key + (("le", bound),))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = format_labels(key + (("le", "+Inf"),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(key)} {count}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in the Prometheus text exposition format.
+
+    Metrics are kept per process, so every worker exposes its own values.
+
+    Returns:
+        str: The metrics page.
+    """
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestMetrics:
+    """Measurements collected while a single request is handled."""
+
+    queries: int = 0
+    sql_time: float = 0.0
+    slowest_sql: str = ""
+    slowest_sql_time: float = 0.0
+    signal_time: float = 0.0
+
+
+current_request = ContextVar("current_request_metrics", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper that adds every query to the current request's metrics."""
+
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.queries += 1
+        metrics.sql_time += elapsed
+        if elapsed > metrics.slowest_sql_time:
+            metrics.slowest_sql_time = elapsed
+            metrics.slowest_sql = sql
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class TimedSignal(Signal):
+    """A signal that adds the time spent in its receivers to the current request's metrics."""
+
+    def send(self, sender, **named):
+        metrics = current_request.get()
+        if metrics is None:
+            return super().send(sender, **named)
+
+        started = time.perf_counter()
+        try:
+            return super().send(sender, **named)
+        finally:
+            metrics.signal_time += time.perf_counter() - started
@@ -0,0 +1,129 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import (
+    QUERY_COUNT_BUCKETS,
+    Histogram,
+    RequestMetrics,
+    current_request,
+)
+
+logger = logging.getLogger(__name__)
+
+request_duration = Histogram(
+    "r4c_request_duration_seconds", "Wall time spent handling a request."
+)
+request_queries = Histogram(
+    "r4c_request_queries",
+    "Database queries executed per request.",
+    QUERY_COUNT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    "r4c_request_sql_duration_seconds", "Total time spent in SQL per request."
+)
+request_slowest_query = Histogram(
+    "r4c_request_slowest_query_seconds", "Duration of the slowest query of a request."
+)
+request_signal_duration = Histogram(
+    "r4c_request_signal_duration_seconds",
+    "Time spent in signal handlers per request.",
+)
+
+
+def latency_budget(seconds):
+    """
+    Override ``REQUEST_LATENCY_BUDGET`` for a view.
+
+    Args:
+        seconds (float | None): The view's budget, or None for views that
+            are slow by design, such as long polls.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(view):
+        view.latency_budget = seconds
+        return view
+
+    return decorator
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware that measures every request, per view.
+
+    It records the wall time, the number of database queries, the total and
+    slowest SQL time and the time spent in signal handlers, and logs a
+    warning when a request exceeds ``REQUEST_QUERY_BUDGET`` queries or
+    ``REQUEST_LATENCY_BUDGET`` seconds (see ``latency_budget``). Aggregated histograms are served in
+    Prometheus text format at ``/metrics/``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+            self.record(request, metrics, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        started = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
+            self.record(request, metrics, time.perf_counter() - started)
+
+    def record(self, request, metrics, elapsed) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+        budget = getattr(
+            match.func if match else None,
+            "latency_budget",
+            settings.REQUEST_LATENCY_BUDGET,
+        )
+
+        request_duration.observe(elapsed, view=view)
+        request_queries.observe(metrics.queries, view=view)
+        request_sql_duration.observe(metrics.sql_time, view=view)
+        request_slowest_query.observe(metrics.slowest_sql_time, view=view)
+        request_signal_duration.observe(metrics.signal_time, view=view)
+
+        if (
+            metrics.queries > settings.REQUEST_QUERY_BUDGET
+            or budget is not None
+            and elapsed > budget
+        ):
+            logger.warning(
+                "%s %s (%s) over budget: %.3fs, %d queries, %.3fs SQL, "
+                "%.3fs in signal handlers, slowest query %.3fs: %s",
+                request.method,
+                request.path,
+                view,
+                elapsed,
+                metrics.queries,
+                metrics.sql_time,
+                metrics.signal_time,
+                metrics.slowest_sql_time,
+                metrics.slowest_sql,
+            )
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    The response to the first request sent with an ``Idempotency-Key`` header.
+
+    A row without a status belongs to a request still in progress. Rows are
+    deleted once they expire, see ``helpers.idempotency.purge_expired_keys``.
+    """
+
+    path = models.CharField(max_length=255, blank=False, null=False)
+    key = models.CharField(max_length=255, blank=False, null=False)
+    fingerprint = models.CharField(max_length=64, blank=False, null=False)
+    status = models.PositiveSmallIntegerField(blank=True, null=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    content = models.BinaryField(blank=True, null=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["path", "key"], name="idempotency_key_path_key_uniq"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_key_expiry_idx")
+        ]
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.http import JsonResponse
+
+from .serialization import json_response
+
+
+def keyset_page(request, queryset, fields):
+    """
+    Respond with one page of rows, paginated on their id.
+
+    Pages are selected with ``id > after`` rather than an OFFSET, so a deep
+    page costs the same as the first one. Rows are read as ``values_list``
+    tuples, never as model instances.
+
+    Query parameters:
+        after (int, optional): The ``next`` cursor of the previous page.
+        limit (int, optional): Rows per page, ``LIST_PAGE_SIZE`` by default
+            and at most ``LIST_MAX_PAGE_SIZE``.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        queryset (QuerySet): The filtered rows to list.
+        fields (list[str]): The fields to return, starting with ``id``.
+
+    Returns:
+        HttpResponse: ``{"results": [...], "next": <cursor or null>}``, or an
+        error response.
+    """
+
+    try:
+        after = int(request.GET.get("after", 0))
+        limit = int(request.GET.get("limit", settings.LIST_PAGE_SIZE))
+    except ValueError:
+        response = {"message": "after and limit must be integers."}
+        return JsonResponse(response, status=400)
+
+    if not 1 <= limit <= settings.LIST_MAX_PAGE_SIZE:
+        response = {
+            "message": f"limit must be between 1 and {settings.LIST_MAX_PAGE_SIZE}."
+        }
+        return JsonResponse(response, status=400)
+
+    rows = list(
+        queryset.filter(id__gt=after).order_by("id").values_list(*fields)[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return json_response(
+        {
+            "results": [dict(zip(fields, row)) for row in rows],
+            "next": rows[-1][0] if has_more else None,
+        }
+    )
@@ -0,0 +1,67 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(data) -> bytes:
+    """
+    Encode data as compact JSON.
+
+    Uses ``orjson`` when it is installed and the standard library otherwise.
+    Dates and datetimes are formatted by ``DjangoJSONEncoder`` either way, so
+    the output does not depend on which one is used.
+
+    Args:
+        data: The data to encode; may contain dates, datetimes and decimals.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(
+            data, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return encoder.encode(data).encode("utf-8")
+
+
+def loads(data):
+    """
+    Decode JSON from bytes or a string.
+
+    Uses ``orjson`` when it is installed and the standard library otherwise;
+    both raise ``json.JSONDecodeError`` on invalid JSON.
+
+    Args:
+        data (bytes | str): The JSON document.
+
+    Returns:
+        The decoded value.
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_response(data, status=200) -> HttpResponse:
+    """
+    Build a JSON response encoded with ``dumps``.
+
+    Args:
+        data: The data to encode.
+        status (int, optional): The HTTP status code.
+
+    Returns:
+        HttpResponse: The response.
+    """
+
+    return HttpResponse(dumps(data), content_type="application/json", status=status)
@@ -0,0 +1,144 @@
+from unittest import skipIf, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from robots.models import Robot
+from .admin import EstimatedCountPaginator
+from .metrics import REGISTRY, Counter, Histogram
+from .middleware import request_duration, request_queries, request_signal_duration
+
+# Create your tests here.
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        Robot.objects.bulk_create(
+            Robot(serial="R2-D2", model="R2", version="D2", created=timezone.now())
+            for _ in range(3)
+        )
+
+    @skipIf(connection.vendor == "postgresql", "Estimates need another database")
+    @override_settings(ADMIN_EXACT_COUNT_THRESHOLD=0)
+    def test_counts_exactly_without_estimates(self):
+        paginator = EstimatedCountPaginator(Robot.objects.all(), 2)
+
+        with self.assertNumQueries(1) as queries:
+            self.assertEqual(paginator.count, 3)
+        self.assertIn("COUNT(*)", queries.captured_queries[0]["sql"])
+        self.assertEqual(paginator.num_pages, 2)
+
+    @skipUnless(connection.vendor == "postgresql", "Estimates need PostgreSQL")
+    def test_counts_exactly_below_the_threshold(self):
+        paginator = EstimatedCountPaginator(Robot.objects.filter(model="R2"), 2)
+
+        # The planner's estimate, then the exact count
+        with self.assertNumQueries(2):
+            self.assertEqual(paginator.count, 3)
+
+
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        # Metrics register themselves; keep the test ones off the metrics page
+        self.addCleanup(REGISTRY.__setitem__, slice(None), list(REGISTRY))
+
+    def test_counter(self):
+        counter = Counter("test_lookups_total", "Lookups.")
+        counter.inc(result="local")
+        counter.inc(2, result="local")
+        counter.inc(result='say "hi"\n')
+
+        self.assertEqual(counter.get(result="local"), 3)
+        self.assertEqual(counter.get(result="database"), 0)
+        self.assertEqual(
+            counter.render(),
+            [
+                "# HELP test_lookups_total Lookups.",
+                "# TYPE test_lookups_total counter",
+                'test_lookups_total{result="local"} 3',
+                'test_lookups_total{result="say \\"hi\\"\\n"} 1',
+            ],
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_queries", "Queries.", (1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value, view="a")
+
+        self.assertEqual(
+            histogram.render(),
+            [
+                "# HELP test_queries Queries.",
+                "# TYPE test_queries histogram",
+                'test_queries_bucket{view="a",le="1"} 2',
+                'test_queries_bucket{view="a",le="5"} 3',
+                'test_queries_bucket{view="a",le="+Inf"} 4',
+                'test_queries_sum{view="a"} 11.0',
+                'test_queries_count{view="a"} 4',
+            ],
+        )
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    view = "robots.views.post_robot"
+
+    def series(self, histogram, view):
+        return histogram.series.get((("view", view),), (None, 0.0, 0))
+
+    def post_robot(self, client=None):
+        return (client or self.client).post(
+            "/api/robots/",
+            {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"},
+            content_type="application/json",
+        )
+
+    def test_records_every_request_per_view(self):
+        _, queries_before, count_before = self.series(request_queries, self.view)
+        _, _, signals_before = self.series(request_signal_duration, self.view)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post_robot()
+
+        _, queries_after, count_after = self.series(request_queries, self.view)
+        self.assertEqual(count_after, count_before + 1)
+        self.assertEqual(queries_after - queries_before, len(queries))
+        self.assertEqual(self.series(request_signal_duration, self.view)[2], signals_before + 1)
+        self.assertGreater(self.series(request_duration, self.view)[1], 0)
+
+    async def test_records_async_requests(self):
+        view = "robots.views.apost_robot"
+        _, _, before = self.series(request_duration, view)
+
+        await self.async_client.post(
+            "/api/async/robots/", "not json", content_type="application/json"
+        )
+
+        self.assertEqual(self.series(request_duration, view)[2], before + 1)
+
+    @override_settings(REQUEST_QUERY_BUDGET=0)
+    def test_requests_over_the_query_budget_are_logged(self):
+        with self.assertLogs("helpers.middleware", "WARNING") as logs:
+            self.post_robot()
+
+        self.assertIn(f"POST /api/robots/ ({self.view}) over budget", logs.output[0])
+
+    def test_metrics_are_served_to_internal_ips(self):
+        self.post_robot()
+
+        response = self.client.get("/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        content = response.content.decode()
+        self.assertIn("# TYPE r4c_request_duration_seconds histogram", content)
+        self.assertIn(f'r4c_request_queries_bucket{{view="{self.view}",le="+Inf"}}', content)
+        self.assertIn("# TYPE r4c_serial_cache_lookups_total counter", content)
+
+    @override_settings(INTERNAL_IPS=["10.0.0.1"])
+    def test_metrics_are_hidden_from_other_clients(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 404)
+        self.assertEqual(
+            self.client.get("/metrics/", REMOTE_ADDR="10.0.0.1").status_code, 200
+        )
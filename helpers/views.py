@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .metrics import render_metrics
+
+
+def metrics(request) -> HttpResponse:
+    """
+    View function exposing the process's request metrics to Prometheus.
+
+    Only clients listed in ``INTERNAL_IPS`` can read the metrics.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The metrics in Prometheus text exposition format.
+    """
+
+    if request.META.get("REMOTE_ADDR") not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,3 +1,109 @@
+from collections import Counter
+
 from django.contrib import admin
+from django.db import transaction
+
+from helpers.admin import LargeTableAdmin
+from robots.models import RobotStock
+from robots.stock import return_to_stock
+from .demand import remove_demand, split_serial
+from .models import EmailNotification, Order, WaitlistedOrder
+from .notifications import build_availability_notification
 
 # Register your models here.
+
+
+@admin.action(description="Cancel selected orders and return the robots to stock")
+def cancel_orders(modeladmin, request, queryset):
+    """
+    Delete orders and put their robots back in stock.
+
+    Runs one query to lock the orders, one to delete them and one to update
+    the stock, however many orders are selected.
+    """
+
+    with transaction.atomic():
+        orders = list(queryset.select_for_update().values_list("id", "robot_serial"))
+        Order.objects.filter(id__in=[pk for pk, _ in orders]).delete()
+        return_to_stock(Counter(serial for _, serial in orders))
+    modeladmin.message_user(request, f"Cancelled {len(orders)} order(s).")
+
+
+@admin.action(description="Notify selected customers of robots in stock")
+def renotify_waitlist(modeladmin, request, queryset):
+    """
+    Queue availability emails for waitlist entries whose serial is in stock.
+
+    Like ``orders.signals.handlers.on_robot_created``, notified entries leave
+    the waitlist; entries for serials out of stock stay on it. Runs one query
+    to lock the entries, one to delete them, one to update the demand and one
+    bulk insert.
+    """
+
+    with transaction.atomic():
+        in_stock = RobotStock.objects.filter(available__gt=0).values("serial")
+        waiting = list(
+            queryset.select_for_update(skip_locked=True, of=("self",))
+            .filter(robot_serial__in=in_stock)
+            .values_list("id", "robot_serial", "customer__email")
+        )
+        WaitlistedOrder.objects.filter(id__in=[pk for pk, _, _ in waiting]).delete()
+        remove_demand(Counter(serial for _, serial, _ in waiting))
+        EmailNotification.objects.bulk_create(
+            build_availability_notification(email, *split_serial(serial))
+            for _, serial, email in waiting
+        )
+    modeladmin.message_user(
+        request,
+        f"Queued {len(waiting)} notification(s); "
+        "entries for robots out of stock were left on the waitlist.",
+    )
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ["id", "customer", "robot_serial", "created"]
+    list_select_related = ["customer"]
+    list_filter = ["created"]
+    search_fields = ["robot_serial__exact", "customer__email__lower__exact"]
+    raw_id_fields = ["customer"]
+    ordering = ["-id"]
+    actions = [cancel_orders]
+
+
+@admin.register(WaitlistedOrder)
+class WaitlistedOrderAdmin(LargeTableAdmin):
+    list_display = ["id", "customer", "robot_serial", "created"]
+    list_select_related = ["customer"]
+    list_filter = ["created"]
+    search_fields = ["robot_serial__exact", "customer__email__lower__exact"]
+    raw_id_fields = ["customer"]
+    ordering = ["-id"]
+    actions = [renotify_waitlist]
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            obj.delete()
+            remove_demand({obj.robot_serial: 1})
+
+    def delete_queryset(self, request, queryset):
+        """
+        Delete waitlist entries and count them out of the demand.
+
+        Used by the ``delete_selected`` action. Like ``renotify_waitlist``, runs
+        one query to lock the entries, one to delete them and one to update
+        the demand.
+        """
+
+        with transaction.atomic():
+            waiting = list(queryset.select_for_update().values_list("id", "robot_serial"))
+            WaitlistedOrder.objects.filter(id__in=[pk for pk, _ in waiting]).delete()
+            remove_demand(Counter(serial for _, serial in waiting))
+
+
+@admin.register(EmailNotification)
+class EmailNotificationAdmin(LargeTableAdmin):
+    list_display = ["id", "recipient", "subject", "status", "attempts", "created"]
+    list_filter = ["status"]
+    search_fields = ["recipient__exact"]
+    ordering = ["-id"]
@@ -0,0 +1,126 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Min, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import SerialDemand, WaitlistedOrder
+
+
+def split_serial(serial) -> tuple:
+    """Return the model and version parts of a ``MODEL-VERSION`` serial."""
+
+    return serial[:2], serial[3:5]
+
+
+def add_demand(serial, waited_since) -> None:
+    """
+    Count one more customer waiting for a serial.
+
+    Must run in the transaction that adds the waitlist entry. The row is
+    updated with a single ``UPDATE`` and only inserted when it does not exist
+    yet; a concurrent insert is caught by the unique serial and retried as an
+    update.
+
+    Args:
+        serial (str): The serial the customer waits for.
+        waited_since (datetime): When the customer was put on the waitlist.
+    """
+
+    rows = SerialDemand.objects.filter(serial=serial)
+    update = {
+        "waiting": F("waiting") + 1,
+        "oldest_wait": Coalesce(F("oldest_wait"), Value(waited_since)),
+    }
+    if rows.update(**update):
+        return
+
+    model, version = split_serial(serial)
+    try:
+        with transaction.atomic():
+            SerialDemand.objects.create(
+                serial=serial,
+                model=model,
+                version=version,
+                waiting=1,
+                oldest_wait=waited_since,
+            )
+    except IntegrityError:
+        rows.update(**update)
+
+
+def remove_demand(counts) -> None:
+    """
+    Count customers who left the waitlist, with one query for all serials.
+
+    Must run in the transaction that deletes the waitlist entries, after
+    the delete. The oldest wait moves on to the oldest remaining entry.
+
+    Args:
+        counts (Mapping[str, int]): The number of entries removed per serial.
+    """
+
+    if not counts:
+        return
+
+    removed = Case(
+        *(When(serial=serial, then=Value(count)) for serial, count in counts.items()),
+        default=Value(0),
+    )
+    oldest_remaining = Subquery(
+        WaitlistedOrder.objects.filter(robot_serial=OuterRef("serial"))
+        .order_by("created")
+        .values("created")[:1]
+    )
+    SerialDemand.objects.filter(serial__in=counts).update(
+        waiting=Greatest(F("waiting") - removed, Value(0)),
+        oldest_wait=Case(
+            When(waiting__gt=removed, then=Coalesce(oldest_remaining, F("oldest_wait"))),
+            default=None,
+        ),
+    )
+
+
+def get_demand(models=None):
+    """
+    List the serials customers are waiting for, most wanted first.
+
+    Args:
+        models (Iterable[str], optional): Only these models. Defaults to all models.
+
+    Returns:
+        QuerySet: ``(serial, model, version, waiting, oldest_wait)`` rows.
+    """
+
+    demand = SerialDemand.objects.filter(waiting__gt=0)
+    if models:
+        demand = demand.filter(model__in=models)
+    return demand.order_by("-waiting", "oldest_wait", "serial").values_list(
+        "serial", "model", "version", "waiting", "oldest_wait"
+    )
+
+
+@transaction.atomic
+def rebuild_serial_demand() -> int:
+    """
+    Recompute the demand table from the waitlist.
+
+    Returns:
+        int: The number of serials customers are waiting for.
+    """
+
+    rows = (
+        WaitlistedOrder.objects.values_list("robot_serial")
+        .annotate(waiting=Count("id"), oldest_wait=Min("created"))
+        .order_by()
+    )
+    SerialDemand.objects.all().delete()
+    demand = SerialDemand.objects.bulk_create(
+        SerialDemand(
+            serial=serial,
+            model=split_serial(serial)[0],
+            version=split_serial(serial)[1],
+            waiting=waiting,
+            oldest_wait=oldest_wait,
+        )
+        for serial, waiting, oldest_wait in rows
+    )
+    return len(demand)
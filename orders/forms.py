@@ -1,8 +1,6 @@
-from django import forms
+from helpers.schemas import Schema
 from .models import Order
 
 
-class OrderForm(forms.ModelForm):
-    class Meta:
-        model = Order
-        fields = ["customer", "robot_serial"]
+# The customer is a plain id, checked by the foreign key constraint
+ORDER_SCHEMA = Schema.for_model(Order, ["customer", "robot_serial"])
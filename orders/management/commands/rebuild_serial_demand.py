@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orders.demand import rebuild_serial_demand
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-serial demand table from the waitlist."
+
+    def handle(self, *args, **options):
+        written = rebuild_serial_demand()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} serial demand row(s)."))
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.notifications import DeliveryStats, deliver_pending_notifications
+
+
+class Command(BaseCommand):
+    help = "Deliver queued email notifications from the outbox, polling for new ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_BATCH_SIZE,
+            help="Maximum number of notifications delivered per batch.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.NOTIFICATION_CHUNK_SIZE,
+            help="Number of messages sent over one mail connection.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.NOTIFICATION_POLL_INTERVAL,
+            help="Seconds to wait before polling again once the outbox is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox once and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = DeliveryStats()
+        try:
+            while True:
+                stats = deliver_pending_notifications(batch_size, options["chunk_size"])
+                if stats.processed:
+                    total += stats
+                    self.stdout.write(f"Batch: {stats}")
+                if stats.processed == batch_size:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Total: {total}")
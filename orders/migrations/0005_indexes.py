@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_emailnotification'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='robot_serial',
+            field=models.CharField(db_index=True, max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='waitlistedorder',
+            name='robot_serial',
+            field=models.CharField(db_index=True, max_length=5),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_created'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='waitlistedorder',
+            name='robot_serial',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'id'], name='order_customer_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistedorder',
+            index=models.Index(fields=['robot_serial', 'id'], name='waitlist_serial_id_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:50
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def backfill_demand(apps, schema_editor):
+    """Count the customers already waiting for each serial."""
+
+    WaitlistedOrder = apps.get_model("orders", "WaitlistedOrder")
+    SerialDemand = apps.get_model("orders", "SerialDemand")
+
+    rows = (
+        WaitlistedOrder.objects.values_list("robot_serial")
+        .annotate(waiting=Count("id"), oldest_wait=Min("created"))
+        .order_by()
+    )
+    SerialDemand.objects.bulk_create(
+        SerialDemand(
+            serial=serial,
+            model=serial[:2],
+            version=serial[3:5],
+            waiting=waiting,
+            oldest_wait=oldest_wait,
+        )
+        for serial, waiting, oldest_wait in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerialDemand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('serial', models.CharField(max_length=5, unique=True)),
+                ('model', models.CharField(max_length=2)),
+                ('version', models.CharField(max_length=2)),
+                ('waiting', models.PositiveIntegerField(default=0)),
+                ('oldest_wait', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_demand, migrations.RunPython.noop),
+    ]
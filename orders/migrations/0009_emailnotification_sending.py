@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_serialdemand'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailnotification',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=7),
+        ),
+    ]
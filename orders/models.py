@@ -1,13 +1,72 @@
 from django.db import models
+from django.utils import timezone
 
 from customers.models import Customer
 
 
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
-    robot_serial = models.CharField(max_length=5, blank=False, null=False)
+    robot_serial = models.CharField(
+        max_length=5, blank=False, null=False, db_index=True
+    )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Pages of a customer's orders, see customers.views.list_customer_orders
+            models.Index(fields=["customer", "id"], name="order_customer_id_idx")
+        ]
 
 
 class WaitlistedOrder(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     robot_serial = models.CharField(max_length=5, blank=False, null=False)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Serves both the lookups by serial and the pages of a serial's waitlist
+            models.Index(fields=["robot_serial", "id"], name="waitlist_serial_id_idx")
+        ]
+
+
+class SerialDemand(models.Model):
+    """Number of customers waiting for a serial and since when, kept in step with the waitlist."""
+
+    serial = models.CharField(max_length=5, blank=False, null=False, unique=True)
+    model = models.CharField(max_length=2, blank=False, null=False)
+    version = models.CharField(max_length=2, blank=False, null=False)
+    waiting = models.PositiveIntegerField(default=0)
+    oldest_wait = models.DateTimeField(blank=True, null=True)
+
+
+class EmailNotification(models.Model):
+    """An email waiting in the outbox to be delivered by the notification worker."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        # Claimed by a worker until next_attempt_at, when the lease expires
+        SENDING = "sending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    recipient = models.EmailField(max_length=255, blank=False, null=False)
+    from_email = models.EmailField(max_length=255, blank=False, null=False)
+    subject = models.CharField(max_length=255, blank=False, null=False)
+    message = models.TextField(blank=False, null=False)
+    status = models.CharField(
+        max_length=7, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="notification_outbox_idx",
+            )
+        ]
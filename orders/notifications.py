@@ -0,0 +1,241 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailNotification
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_SUBJECT = "Робот в наличии!"
+
+AVAILABILITY_FROM_EMAIL = "melanhany@gmail.com"
+
+
+@dataclass
+class DeliveryStats:
+    """Throughput counters of the notification worker."""
+
+    sent: int = 0
+    failed: int = 0
+    connections: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def messages_per_connection(self) -> float:
+        """How many messages each SMTP connection was reused for."""
+
+        return self.processed / self.connections if self.connections else 0.0
+
+    def __add__(self, other):
+        return DeliveryStats(
+            sent=self.sent + other.sent,
+            failed=self.failed + other.failed,
+            connections=self.connections + other.connections,
+            elapsed=self.elapsed + other.elapsed,
+        )
+
+    def __str__(self):
+        return (
+            f"sent={self.sent} failed={self.failed} connections={self.connections} "
+            f"messages/sec={self.messages_per_second:.1f} "
+            f"messages/connection={self.messages_per_connection:.1f}"
+        )
+
+
+def build_availability_notification(email, model, version) -> EmailNotification:
+    """
+    Build the outbox email telling a waiting customer that a robot is in stock.
+
+    Args:
+        email (str): The email of the customer.
+        model (str): The model of the robot.
+        version (str): The version of the robot.
+
+    Returns:
+        EmailNotification: The unsaved notification.
+    """
+
+    message = f"""Добрый день!
+                     Недавно вы интересовались нашим роботом модели {model}, версии {version}. 
+                     Этот робот теперь в наличии. Если вам подходит этот вариант - пожалуйста, свяжитесь с нами"""
+    return EmailNotification(
+        recipient=email,
+        from_email=AVAILABILITY_FROM_EMAIL,
+        subject=AVAILABILITY_SUBJECT,
+        message=message,
+    )
+
+
+def retry_delay(attempts) -> timedelta:
+    """
+    Return the exponential backoff before the next delivery attempt.
+
+    Args:
+        attempts (int): The number of failed attempts so far.
+
+    Returns:
+        timedelta: The delay, capped at ``NOTIFICATION_RETRY_MAX_DELAY`` seconds.
+    """
+
+    delay = settings.NOTIFICATION_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.NOTIFICATION_RETRY_MAX_DELAY))
+
+
+def record_failure(notification, exc) -> None:
+    """
+    Schedule a retry of a failed notification, or give up on it.
+
+    Args:
+        notification (EmailNotification): The notification that failed.
+        exc (Exception): The delivery error.
+    """
+
+    notification.attempts += 1
+    notification.last_error = str(exc)
+    if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        notification.status = EmailNotification.Status.FAILED
+        logger.error(
+            "Giving up on notification %s after %s attempts: %s",
+            notification.id,
+            notification.attempts,
+            exc,
+        )
+    else:
+        notification.status = EmailNotification.Status.PENDING
+        notification.next_attempt_at = timezone.now() + retry_delay(
+            notification.attempts
+        )
+
+
+def send_chunk(connection, notifications, stats) -> None:
+    """
+    Send a chunk of notifications over a single mail connection.
+
+    Every notification is sent as its own ``EmailMessage`` with a single
+    recipient, so customers never see each other's addresses.
+
+    Args:
+        connection: An email backend instance from ``get_connection``.
+        notifications (list[EmailNotification]): The notifications to send.
+        stats (DeliveryStats): The counters to update.
+    """
+
+    try:
+        connection.open()
+    except Exception as exc:
+        for notification in notifications:
+            record_failure(notification, exc)
+        stats.failed += len(notifications)
+        return
+
+    stats.connections += 1
+    try:
+        for notification in notifications:
+            message = EmailMessage(
+                notification.subject,
+                notification.message,
+                notification.from_email,
+                [notification.recipient],
+                connection=connection,
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                record_failure(notification, exc)
+                stats.failed += 1
+            else:
+                notification.attempts += 1
+                notification.status = EmailNotification.Status.SENT
+                notification.sent_at = timezone.now()
+                stats.sent += 1
+    finally:
+        connection.close()
+
+
+def claim_notifications(batch_size) -> list:
+    """
+    Lease a batch of due notifications to this worker.
+
+    The batch is locked with ``SELECT ... FOR UPDATE SKIP LOCKED`` and marked
+    as being sent until ``NOTIFICATION_LEASE`` seconds from now, in a short
+    transaction of its own, so no row lock is held while mail is sent. Rows
+    whose lease expired, because their worker died, are due again.
+
+    Args:
+        batch_size (int): The maximum number of notifications to claim.
+
+    Returns:
+        list[EmailNotification]: The claimed notifications.
+    """
+
+    with transaction.atomic():
+        now = timezone.now()
+        notifications = list(
+            EmailNotification.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[
+                    EmailNotification.Status.PENDING,
+                    EmailNotification.Status.SENDING,
+                ],
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        EmailNotification.objects.filter(
+            id__in=[notification.id for notification in notifications]
+        ).update(
+            status=EmailNotification.Status.SENDING,
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFICATION_LEASE),
+        )
+    return notifications
+
+
+def deliver_pending_notifications(batch_size, chunk_size=None) -> DeliveryStats:
+    """
+    Deliver one batch of due notifications from the outbox.
+
+    The batch is claimed with ``claim_notifications`` so several workers can
+    drain the outbox concurrently without sending an email twice. It is sent
+    outside any transaction, in chunks of ``chunk_size`` messages, each chunk
+    over one reused mail connection, and the results are saved with a single
+    bulk update. Failed deliveries are retried with exponential backoff until
+    ``NOTIFICATION_MAX_ATTEMPTS`` is reached, then marked as failed.
+
+    Args:
+        batch_size (int): The maximum number of notifications to deliver.
+        chunk_size (int, optional): The number of messages sent per connection.
+            Defaults to ``NOTIFICATION_CHUNK_SIZE``.
+
+    Returns:
+        DeliveryStats: The throughput counters of the batch.
+    """
+
+    chunk_size = chunk_size or settings.NOTIFICATION_CHUNK_SIZE
+    started = time.perf_counter()
+    notifications = claim_notifications(batch_size)
+
+    stats = DeliveryStats()
+    connection = get_connection(fail_silently=False)
+    for start in range(0, len(notifications), chunk_size):
+        send_chunk(connection, notifications[start : start + chunk_size], stats)
+
+    EmailNotification.objects.bulk_update(
+        notifications,
+        ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+    )
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -1,15 +1,19 @@
-from django.db.models.signals import post_save
+from django.db.models import Count
+from django.db.models.signals import post_delete, pre_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from robots.models import Robot
-from orders.models import WaitlistedOrder
-from robots.signals import robot_created
+from collections import Counter
+
+from customers.models import Customer
+from orders.demand import remove_demand
+from orders.models import EmailNotification, WaitlistedOrder
+from orders.notifications import build_availability_notification
+from robots.signals import get_created_robots, robot_created
 
 
 @receiver(robot_created)
 def on_robot_created(sender, **kwargs):
     """
-    Signal handler that sends an email notification to customers
+    Signal handler that queues an email notification to customers
     when a robot they were interested in becomes available in stock.
 
     Args:
@@ -17,34 +21,82 @@ def on_robot_created(sender, **kwargs):
         kwargs (dict): Keyword arguments passed along with the signal.
 
     This signal handler performs the following actions:
-    1. Retrieves the created robot from the signal arguments.
-    2. Queries the WaitlistedOrder model for customers interested in this robot.
-    3. Composes an email message with information about the available robot.
-    4. Sends an email to the interested customers.
+    1. Retrieves the created robot(s) from the signal arguments.
+    2. Locks the waitlist entries for the created serials and fetches the emails of the
+       waiting customers with a single query.
+    3. Deletes those waitlist entries, so a customer is notified only once even when
+       robots of the same serial are created concurrently, and counts them out of the
+       serials' demand.
+    4. Queues one email per serial and customer in the notification outbox, so a batch
+       with many robots of the same serial does not notify them repeatedly.
 
-    Note: The email sending process uses Django's send_mail function.
+    The number of queries does not depend on the number of waiting customers.
 
-    Exceptions:
-        WaitlistedOrder.DoesNotExist: If no customers are interested in the robot, no action is taken.
+    Note: The signal is sent inside the transaction that creates the robots, so the outbox
+    rows are committed together with them. The emails are delivered by the
+    ``send_notifications`` management command, keeping SMTP off the request path.
 
     Example Usage:
     This signal handler is executed when a new robot is created and checks if any customers were
-    interested in that robot. If interested customers exist, it sends them an email notification.
+    interested in that robot. If interested customers exist, it queues an email notification for them.
+    """
+
+    robots = {robot.serial: robot for robot in get_created_robots(kwargs)}
+
+    # Entries locked by a concurrent transaction are being notified by it
+    waiting = list(
+        WaitlistedOrder.objects.select_for_update(skip_locked=True, of=("self",))
+        .filter(robot_serial__in=robots)
+        .values_list("id", "robot_serial", "customer__email")
+    )
+    if not waiting:
+        return
+
+    WaitlistedOrder.objects.filter(id__in=[pk for pk, _, _ in waiting]).delete()
+    remove_demand(Counter(serial for _, serial, _ in waiting))
+
+    notifications = []
+    for _, serial, email in waiting:
+        robot = robots[serial]
+        notifications.append(
+            build_availability_notification(email, robot.model, robot.version)
+        )
+    EmailNotification.objects.bulk_create(notifications)
+
+
+@receiver(pre_delete, sender=Customer)
+def count_deleted_waitlist(sender, instance, **kwargs):
+    """
+    Signal handler that counts the waitlist entries a deleted customer takes along.
+
+    Args:
+        sender: The sender of the signal.
+        instance (Customer): The customer being deleted.
+        kwargs (dict): Keyword arguments passed along with the signal.
+
+    The entries are deleted by the cascade, which bypasses ``remove_demand``;
+    ``remove_deleted_demand`` counts them out of the demand once they are gone.
+    """
+
+    instance.waitlist_counts = dict(
+        WaitlistedOrder.objects.filter(customer=instance)
+        .values_list("robot_serial")
+        .annotate(Count("id"))
+        .order_by()
+    )
+
+
+@receiver(post_delete, sender=Customer)
+def remove_deleted_demand(sender, instance, **kwargs):
+    """
+    Signal handler that counts a deleted customer's waitlist entries out of the demand.
+
+    Args:
+        sender: The sender of the signal.
+        instance (Customer): The deleted customer.
+        kwargs (dict): Keyword arguments passed along with the signal.
+
+    Runs in the transaction of the delete, after the cascade.
     """
 
-    robot = kwargs["robot"]
-
-    try:
-        queryset = WaitlistedOrder.objects.filter(robot_serial=robot.serial)
-        customers = [order.customer for order in queryset]
-        waitlisted_robot = Robot.objects.filter(serial=robot.serial).first()
-        subject = "Робот в наличии!"
-        message = f"""Добрый день!
-                     Недавно вы интересовались нашим роботом модели {waitlisted_robot.model}, версии {waitlisted_robot.version}. 
-                     Этот робот теперь в наличии. Если вам подходит этот вариант - пожалуйста, свяжитесь с нами"""
-        from_email = "melanhany@gmail.com"
-        recipients = [customer.email for customer in customers]
-        send_mail(subject, message, from_email, recipients, fail_silently=False)
-
-    except WaitlistedOrder.DoesNotExist:
-        pass
+    remove_demand(getattr(instance, "waitlist_counts", {}))
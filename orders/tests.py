@@ -1,3 +1,499 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from customers.models import Customer
+from helpers.idempotency import purge_expired_keys
+from helpers.models import IdempotencyKey
+from robots import serials
+from robots.models import Robot, RobotStock
+from robots.signals import robot_created
+from .admin import OrderAdmin, WaitlistedOrderAdmin, cancel_orders, renotify_waitlist
+from .demand import add_demand
+from .models import EmailNotification, Order, SerialDemand, WaitlistedOrder
+from .notifications import deliver_pending_notifications
+from .signals.handlers import on_robot_created
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class DeliverPendingNotificationsTests(TestCase):
+    def setUp(self):
+        EmailNotification.objects.bulk_create(
+            EmailNotification(
+                recipient=f"customer{i}@example.com",
+                from_email="melanhany@gmail.com",
+                subject="Робот в наличии!",
+                message="Этот робот теперь в наличии.",
+            )
+            for i in range(5)
+        )
+
+    def test_sends_individual_messages_over_reused_connections(self):
+        stats = deliver_pending_notifications(batch_size=10, chunk_size=2)
+
+        self.assertEqual(stats.sent, 5)
+        self.assertEqual(stats.failed, 0)
+        self.assertEqual(stats.connections, 3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertTrue(all(len(message.to) == 1 for message in mail.outbox))
+        self.assertFalse(
+            EmailNotification.objects.exclude(
+                status=EmailNotification.Status.SENT
+            ).exists()
+        )
+
+    def test_respects_batch_size(self):
+        stats = deliver_pending_notifications(batch_size=3, chunk_size=2)
+
+        self.assertEqual(stats.processed, 3)
+        self.assertEqual(
+            EmailNotification.objects.filter(
+                status=EmailNotification.Status.PENDING
+            ).count(),
+            2,
+        )
+
+    def test_leased_notifications_are_skipped_until_the_lease_expires(self):
+        notifications = list(EmailNotification.objects.order_by("id"))
+        EmailNotification.objects.filter(id=notifications[0].id).update(
+            status=EmailNotification.Status.SENDING,
+            next_attempt_at=timezone.now() + timedelta(minutes=5),
+        )
+        EmailNotification.objects.filter(id=notifications[1].id).update(
+            status=EmailNotification.Status.SENDING,
+            next_attempt_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        stats = deliver_pending_notifications(batch_size=10)
+
+        self.assertEqual(stats.sent, 4)
+        self.assertEqual(
+            EmailNotification.objects.get(
+                status=EmailNotification.Status.SENDING
+            ).id,
+            notifications[0].id,
+        )
+
+    @override_settings(EMAIL_BACKEND="orders.tests.ClaimCheckingEmailBackend")
+    def test_notifications_are_claimed_before_sending(self):
+        stats = deliver_pending_notifications(batch_size=10, chunk_size=2)
+
+        self.assertEqual(stats.sent, 5)
+        self.assertEqual(ClaimCheckingEmailBackend.claimed, [5, 5, 5, 5, 5])
+
+
+class ClaimCheckingEmailBackend(locmem.EmailBackend):
+    """Records how many notifications are claimed whenever a message is sent."""
+
+    claimed = []
+
+    def send_messages(self, messages):
+        ClaimCheckingEmailBackend.claimed.append(
+            EmailNotification.objects.filter(
+                status=EmailNotification.Status.SENDING
+            ).count()
+        )
+        return super().send_messages(messages)
+
+
+class OnRobotCreatedTests(TestCase):
+    def create_robot(self):
+        return Robot.objects.create(
+            serial="R2-D2", model="R2", version="D2", created=timezone.now()
+        )
+
+    def waitlist(self, count):
+        start = Customer.objects.count()
+        customers = Customer.objects.bulk_create(
+            Customer(email=f"customer{i}@example.com")
+            for i in range(start, start + count)
+        )
+        WaitlistedOrder.objects.bulk_create(
+            WaitlistedOrder(customer=customer, robot_serial="R2-D2")
+            for customer in customers
+        )
+
+    def test_query_count_does_not_depend_on_waiting_customers(self):
+        for count in (1, 25):
+            with self.subTest(count=count):
+                self.waitlist(count)
+                robot = self.create_robot()
+
+                # Fetch emails, delete waitlist entries, update demand, insert outbox rows
+                with self.assertNumQueries(4):
+                    on_robot_created(sender=Robot, robot=robot)
+
+                self.assertEqual(
+                    EmailNotification.objects.filter(
+                        message__contains="модели R2, версии D2"
+                    ).count(),
+                    count,
+                )
+                EmailNotification.objects.all().delete()
+
+    def test_notifies_waiting_customers_once(self):
+        self.waitlist(3)
+        robot = self.create_robot()
+
+        on_robot_created(sender=Robot, robot=robot)
+        on_robot_created(sender=Robot, robot=robot)
+
+        self.assertFalse(WaitlistedOrder.objects.exists())
+        self.assertEqual(EmailNotification.objects.count(), 3)
+
+
+class PostOrderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        serials.local_serials.clear()
+        serials.warmed = False
+        self.customer = Customer.objects.create(email="customer@example.com")
+
+    def post_order(self, customer_id, robot_serial):
+        return self.client.post(
+            "/api/orders/",
+            {"customer": customer_id, "robot_serial": robot_serial},
+            content_type="application/json",
+        )
+
+    def test_known_serial_is_reserved_without_lookups(self):
+        Robot.objects.create(
+            serial="R2-D2", model="R2", version="D2", created=timezone.now()
+        )
+        robot_created.send(Robot, robot=Robot.objects.get())
+        self.post_order(self.customer.id, "R2-D2")
+        self.post_order(self.customer.id, "R2-D2")
+
+        # Reserve the robot, insert the waitlist entry, count its demand, in a transaction
+        with self.assertNumQueries(5):
+            response = self.post_order(self.customer.id, "R2-D2")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(WaitlistedOrder.objects.count(), 2)
+
+    @override_settings(SERIAL_CACHE_NEGATIVE_TTL=60)
+    def test_unknown_serial_goes_straight_to_the_waitlist(self):
+        self.post_order(self.customer.id, "C3-PO")
+
+        # Insert the waitlist entry, count its demand, in a transaction
+        with self.assertNumQueries(4):
+            response = self.post_order(self.customer.id, "C3-PO")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(WaitlistedOrder.objects.count(), 2)
+
+    def test_serial_produced_by_another_process_is_reserved(self):
+        self.post_order(self.customer.id, "C3-PO")
+        # Produced by a process whose cache this one does not share
+        RobotStock.objects.create(serial="C3-PO", available=1)
+
+        response = self.post_order(self.customer.id, "C3-PO")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_customer_id_may_be_a_string_of_digits(self):
+        response = self.post_order(str(self.customer.id), "C3-PO")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(WaitlistedOrder.objects.get().customer, self.customer)
+
+    def test_invalid_order_is_rejected_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.post_order(True, "R2-D2-X")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {
+                "message": "Validation error",
+                "errors": {
+                    "customer": ["Enter a whole number."],
+                    "robot_serial": [
+                        "Ensure this value has at most 5 characters (it has 7)."
+                    ],
+                },
+            },
+        )
+
+    def test_demand_follows_the_waitlist(self):
+        other = Customer.objects.create(email="other@example.com")
+        self.post_order(self.customer.id, "C3-PO")
+        self.post_order(other.id, "C3-PO")
+        first = WaitlistedOrder.objects.earliest("id")
+
+        response = self.client.get("/api/waitlist/demand/")
+        [row] = response.json()["results"]
+        self.assertEqual(row["serial"], "C3-PO")
+        self.assertEqual(row["waiting"], 2)
+        self.assertEqual(SerialDemand.objects.get().oldest_wait, first.created)
+
+        on_robot_created(
+            sender=Robot,
+            robot=Robot.objects.create(
+                serial="C3-PO", model="C3", version="PO", created=timezone.now()
+            ),
+        )
+        demand = SerialDemand.objects.get()
+        self.assertEqual((demand.waiting, demand.oldest_wait), (0, None))
+        self.assertEqual(self.client.get("/api/waitlist/demand/").json(), {"results": []})
+
+
+class WaitlistDeletionTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="customer@example.com")
+        self.other = Customer.objects.create(email="other@example.com")
+        for customer in (self.customer, self.other, self.customer):
+            self.client.post(
+                "/api/orders/",
+                {"customer": customer.id, "robot_serial": "C3-PO"},
+                content_type="application/json",
+            )
+
+    def assertDemand(self, waiting, oldest_wait):
+        demand = SerialDemand.objects.get()
+        self.assertEqual((demand.waiting, demand.oldest_wait), (waiting, oldest_wait))
+
+    def test_deleting_a_customer_counts_their_waitlist_out(self):
+        remaining = WaitlistedOrder.objects.get(customer=self.other)
+
+        self.customer.delete()
+
+        self.assertDemand(1, remaining.created)
+
+    def test_admin_deletes_count_entries_out(self):
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(User.objects.get())
+        first, second, third = WaitlistedOrder.objects.order_by("id")
+
+        self.client.post(
+            "/admin/orders/waitlistedorder/",
+            {
+                "action": "delete_selected",
+                "_selected_action": [first.id, second.id],
+                "post": "yes",
+            },
+        )
+        self.assertDemand(1, third.created)
+
+        self.client.post(f"/admin/orders/waitlistedorder/{third.id}/delete/", {"post": "yes"})
+        self.assertDemand(0, None)
+        self.assertFalse(WaitlistedOrder.objects.exists())
+
+
+class AdminActionTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="customer@example.com")
+        self.other = Customer.objects.create(email="other@example.com")
+        self.request = RequestFactory().post("/admin/")
+        self.request._messages = CookieStorage(self.request)
+
+    def test_cancel_orders_returns_the_robots_to_stock(self):
+        RobotStock.objects.create(serial="R2-D2", available=0)
+        RobotStock.objects.create(serial="C3-PO", available=1)
+        for customer, serial in [
+            (self.customer, "R2-D2"),
+            (self.other, "R2-D2"),
+            (self.customer, "C3-PO"),
+        ]:
+            Order.objects.create(customer=customer, robot_serial=serial)
+
+        # Lock the orders, delete them, update the stock, in a transaction
+        with self.assertNumQueries(5):
+            cancel_orders(OrderAdmin(Order, admin.site), self.request, Order.objects.all())
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(
+            dict(RobotStock.objects.values_list("serial", "available")),
+            {"R2-D2": 2, "C3-PO": 2},
+        )
+
+    def test_renotify_waitlist_leaves_entries_out_of_stock_waiting(self):
+        RobotStock.objects.create(serial="R2-D2", available=1)
+        RobotStock.objects.create(serial="C3-PO", available=0)
+        for customer, serial in [
+            (self.customer, "R2-D2"),
+            (self.other, "R2-D2"),
+            (self.customer, "C3-PO"),
+        ]:
+            WaitlistedOrder.objects.create(customer=customer, robot_serial=serial)
+            add_demand(serial, timezone.now())
+
+        # Lock the entries in stock, delete them, update the demand, insert the
+        # notifications, in a transaction
+        with self.assertNumQueries(6):
+            renotify_waitlist(
+                WaitlistedOrderAdmin(WaitlistedOrder, admin.site),
+                self.request,
+                WaitlistedOrder.objects.all(),
+            )
+
+        self.assertEqual(
+            list(WaitlistedOrder.objects.values_list("robot_serial", flat=True)),
+            ["C3-PO"],
+        )
+        self.assertEqual(
+            dict(SerialDemand.objects.values_list("serial", "waiting")),
+            {"R2-D2": 0, "C3-PO": 1},
+        )
+        notifications = EmailNotification.objects.order_by("recipient")
+        self.assertEqual(
+            [notification.recipient for notification in notifications],
+            ["customer@example.com", "other@example.com"],
+        )
+        self.assertIn("модели R2, версии D2", notifications[0].message)
+
+
+class ListWaitlistTests(TestCase):
+    url = "/api/waitlist/R2-D2/"
+
+    def setUp(self):
+        customer = Customer.objects.create(email="customer@example.com")
+        self.ids = [
+            WaitlistedOrder.objects.create(customer=customer, robot_serial="R2-D2").id
+            for _ in range(5)
+        ]
+        WaitlistedOrder.objects.create(customer=customer, robot_serial="C3-PO")
+
+    def get_page(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursors_walk_through_every_entry_once(self):
+        ids = []
+        pages = 0
+        cursor = 0
+        while cursor is not None:
+            page = self.get_page(after=cursor, limit=2)
+            ids.extend(entry["id"] for entry in page["results"])
+            cursor = page["next"]
+            pages += 1
+
+        self.assertEqual(ids, self.ids)
+        self.assertEqual(pages, 3)
+
+    def test_full_last_page_has_no_next_cursor(self):
+        page = self.get_page(limit=5)
+
+        self.assertEqual([entry["id"] for entry in page["results"]], self.ids)
+        self.assertIsNone(page["next"])
+        self.assertEqual(page["results"][0]["robot_serial"], "R2-D2")
+
+    def test_cursor_past_the_end_returns_an_empty_page(self):
+        self.assertEqual(self.get_page(after=self.ids[-1]), {"results": [], "next": None})
+
+    @override_settings(LIST_MAX_PAGE_SIZE=10)
+    def test_invalid_cursors_and_limits_are_rejected(self):
+        for params in ({"after": "abc"}, {"after": "1.5"}, {"limit": "0"}, {"limit": "11"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class ListDemandTests(TestCase):
+    def test_most_wanted_serials_first(self):
+        now = timezone.now()
+        SerialDemand.objects.bulk_create(
+            [
+                SerialDemand(serial="R2-D2", model="R2", version="D2", waiting=1, oldest_wait=now),
+                SerialDemand(serial="C3-PO", model="C3", version="PO", waiting=3, oldest_wait=now),
+                SerialDemand(serial="R2-A1", model="R2", version="A1", waiting=2, oldest_wait=now),
+                SerialDemand(serial="X5-LT", model="X5", version="LT", waiting=0),
+            ]
+        )
+
+        def serials(**params):
+            results = self.client.get("/api/waitlist/demand/", params).json()["results"]
+            return [(row["serial"], row["waiting"]) for row in results]
+
+        self.assertEqual(serials(), [("C3-PO", 3), ("R2-A1", 2), ("R2-D2", 1)])
+        self.assertEqual(serials(model="R2"), [("R2-A1", 2), ("R2-D2", 1)])
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportOrdersTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(email="customer@example.com")
+        for model, serials, created in [
+            (Order, ["R2-D2", "C3-PO", "R2-A1"], datetime(2023, 1, 1, 12)),
+            (WaitlistedOrder, ["R2-D2", "X5-LT"], datetime(2023, 1, 2, 12)),
+        ]:
+            for day, serial in enumerate(serials):
+                entry = model.objects.create(customer=customer, robot_serial=serial)
+                model.objects.filter(id=entry.id).update(
+                    created=timezone.make_aware(created + timedelta(days=day))
+                )
+
+    def serials(self, path, query=""):
+        response = self.client.get(f"{path}{query}")
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [json.loads(line)["robot_serial"] for line in lines]
+
+    def test_exports_orders(self):
+        self.assertEqual(self.serials("/api/orders/export/"), ["R2-D2", "C3-PO", "R2-A1"])
+        self.assertEqual(
+            self.serials("/api/orders/export/", "?start=2023-01-02&end=2023-01-03"), ["C3-PO"]
+        )
+        # The model is the prefix of the serial
+        self.assertEqual(self.serials("/api/orders/export/", "?model=R2"), ["R2-D2", "R2-A1"])
+
+    def test_exports_the_waitlist(self):
+        self.assertEqual(self.serials("/api/waitlist/export/"), ["R2-D2", "X5-LT"])
+        self.assertEqual(self.serials("/api/waitlist/export/", "?start=2023-01-03"), ["X5-LT"])
+        self.assertEqual(
+            self.serials("/api/waitlist/export/", "?model=X5&model=C3&end=2023-01-02"), []
+        )
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = Customer.objects.create(email="customer@example.com")
+
+    def post_order(self, robot_serial, key):
+        return self.client.post(
+            "/api/orders/",
+            {"customer": self.customer.id, "robot_serial": robot_serial},
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post_order("C3-PO", "retry")
+
+        retry = self.post_order("C3-PO", "retry")
+
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(WaitlistedOrder.objects.count(), 1)
+
+    def test_expired_keys_are_claimed_again_and_purged(self):
+        self.post_order("C3-PO", "retry")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        retry = self.post_order("C3-PO", "retry")
+
+        self.assertNotIn("Idempotent-Replayed", retry)
+        self.assertEqual(WaitlistedOrder.objects.count(), 2)
+        self.assertEqual(purge_expired_keys(), 0)
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(purge_expired_keys(), 1)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.post_order("C3-PO", "retry")
+
+        response = self.post_order("R2-D2", "retry")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(WaitlistedOrder.objects.count(), 1)
@@ -2,5 +2,10 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("api/orders/", views.post_order)
+    path("api/orders/", views.post_order),
+    path("api/async/orders/", views.apost_order),
+    path("api/orders/export/", views.export_orders),
+    path("api/waitlist/export/", views.export_waitlist),
+    path("api/waitlist/demand/", views.list_demand),
+    path("api/waitlist/<str:robot_serial>/", views.list_waitlist),
 ]
\ No newline at end of file
@@ -1,38 +1,87 @@
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 import json
 
-from customers.models import Customer
-
-from .forms import OrderForm
-from .models import WaitlistedOrder
-from robots.models import Robot
-from helpers.helpers import validate_json_data
+from .demand import add_demand, get_demand
+from .forms import ORDER_SCHEMA
+from .models import Order, WaitlistedOrder
+from robots.serials import is_known_serial
+from robots.stock import reserve_robot
+from helpers.executors import run_blocking
+from helpers.exports import export_response
+from helpers.pagination import keyset_page
+from helpers.serialization import json_response, loads
+from helpers.helpers import async_csrf_exempt
+from helpers.idempotency import idempotent
 
 # Create your views here.
 
+ORDER_EXPORT_FIELDS = ["id", "customer_id", "robot_serial", "created"]
+
 
-def create_order_instance(data) -> OrderForm:
+def submit_order(data) -> JsonResponse:
     """
-    Create an instance of the OrderForm with the given data.
+    Validate an order and place it.
+
+    A robot of the ordered serial is reserved from stock with a single
+    conditional UPDATE in the same transaction as the order. When none is
+    in stock, the customer is put on the waitlist instead, and the serial's
+    demand is counted in the same transaction. Serials that were never
+    produced skip the reservation, and the customer is checked by the
+    foreign key constraint rather than looked up beforehand.
 
     Args:
-        data (dict): A dictionary containing data for creating an order instance.
+        data: The parsed JSON body, checked with ``ORDER_SCHEMA``.
 
     Returns:
-        OrderForm: An instance of the OrderForm.
+        JsonResponse: A JSON response containing the result of the operation.
     """
 
-    order_data = {"customer": data["customer"], "robot_serial": data["robot_serial"]}
-    return OrderForm(order_data)
+    data, error = ORDER_SCHEMA.validate(data)
+    if error is not None:
+        return JsonResponse(error, status=400)
+
+    customer_id = data["customer"]
+    robot_serial = data["robot_serial"]
+    try:
+        with transaction.atomic():
+            reserved = is_known_serial(robot_serial) and reserve_robot(robot_serial)
+            if reserved:
+                order = Order.objects.create(
+                    customer_id=customer_id, robot_serial=robot_serial
+                )
+            else:
+                waitlisted = WaitlistedOrder.objects.create(
+                    customer_id=customer_id, robot_serial=robot_serial
+                )
+                add_demand(robot_serial, waitlisted.created)
+    except IntegrityError:
+        response = {
+            "message": "Validation error",
+            "errors": {"customer": ["Customer with such id does not exist."]},
+        }
+        return JsonResponse(response, status=400)
+
+    if not reserved:
+        response = {"message": "There isn't robots with such serial"}
+        return JsonResponse(response, status=400)
+
+    response = {"message": f"New order added with id: {order.id}"}
+    return JsonResponse(response, status=201)
 
 
 @method_decorator(csrf_exempt, name="dispatch")
+@idempotent
 def post_order(request) -> JsonResponse:
     """
     View function for creating a new order via HTTP POST request.
 
+    Retries sent with the same ``Idempotency-Key`` header get the first
+    response back without running the view again; see
+    ``helpers.idempotency.idempotent``.
+
     Args:
         request (HttpRequest): The HTTP request object.
 
@@ -41,44 +90,128 @@ def post_order(request) -> JsonResponse:
     """
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
-            required_fields = {"customer", "robot_serial"}
-            missing_fields = validate_json_data(data, required_fields)
-
-            if missing_fields:
-                missing_fields_list = ", ".join(missing_fields)
-                response = {
-                    "message": f"Missing required field(s) in JSON data: {missing_fields_list}"
-                }
-                return JsonResponse(response, status=400)
-
-            form = create_order_instance(data)
-            if form.is_valid():
-                customer_id = data["customer"]
-                robot_serial = data["robot_serial"]
-                try:
-                    Robot.objects.get(serial=robot_serial)
-                except Robot.DoesNotExist:
-                    customer = Customer.objects.get(id=customer_id)
-                    waitlisted_order = WaitlistedOrder(
-                        customer=customer, robot_serial=robot_serial
-                    )
-                    waitlisted_order.save()
-
-                    response = {"message": "There isn't robots with such serial"}
-                    return JsonResponse(response, status=400)
-
-                order = form.save()
-                response = {"message": f"New order added with id: {order.id}"}
-                return JsonResponse(response, status=201)
+            data = loads(request.body)
+            return submit_order(data)
 
-            else:
-                errors = form.errors
-                response = {"message": "Validation error", "errors": errors}
-                return JsonResponse(response, status=400)
         except json.JSONDecodeError:
             response = {"message": "Invalid JSON format in the request body."}
             return JsonResponse(response, status=400)
     else:
         response = {"message": "Invalid request."}
         return JsonResponse(response, status=400)
+
+
+@async_csrf_exempt
+@idempotent
+async def apost_order(request) -> JsonResponse:
+    """
+    Async counterpart of ``post_order`` for ASGI servers.
+
+    Validation and the reservation transaction run together in the bounded
+    blocking executor.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: A JSON response containing the result of the operation.
+    """
+    if request.method != "POST":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    try:
+        data = loads(request.body)
+    except json.JSONDecodeError:
+        response = {"message": "Invalid JSON format in the request body."}
+        return JsonResponse(response, status=400)
+
+    return await run_blocking(submit_order, data)
+
+
+def export_orders(request) -> HttpResponse:
+    """
+    View function for streaming orders as NDJSON or CSV.
+
+    See ``helpers.exports.export_response`` for the query parameters.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: A streaming response with the orders, ordered by id.
+    """
+
+    return export_response(
+        request,
+        Order.objects.all(),
+        ORDER_EXPORT_FIELDS,
+        "robot_serial",
+        "orders",
+    )
+
+
+def export_waitlist(request) -> HttpResponse:
+    """
+    View function for streaming the waitlist as NDJSON or CSV.
+
+    See ``helpers.exports.export_response`` for the query parameters.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: A streaming response with the waitlist, ordered by id.
+    """
+
+    return export_response(
+        request,
+        WaitlistedOrder.objects.all(),
+        ORDER_EXPORT_FIELDS,
+        "robot_serial",
+        "waitlist",
+    )
+
+
+def list_waitlist(request, robot_serial) -> HttpResponse:
+    """
+    View function for listing the customers waiting for a serial, one page at a time.
+
+    See ``helpers.pagination.keyset_page`` for the query parameters.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        robot_serial (str): The serial of the robot.
+
+    Returns:
+        HttpResponse: A page of waitlist entries, in the order they were made.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    waitlist = WaitlistedOrder.objects.filter(robot_serial=robot_serial)
+    return keyset_page(request, waitlist, ORDER_EXPORT_FIELDS)
+
+
+def list_demand(request) -> HttpResponse:
+    """
+    View function for listing the serials customers are waiting for, most wanted first.
+
+    Query parameters:
+        model (str, optional): Only serials of this robot model; may be repeated.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The serials with their model, version, number of waiting
+        customers and the moment the longest waiting one joined the waitlist.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    fields = ["serial", "model", "version", "waiting", "oldest_wait"]
+    demand = get_demand(request.GET.getlist("model"))
+    return json_response({"results": [dict(zip(fields, row)) for row in demand]})
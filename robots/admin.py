@@ -1,3 +1,68 @@
 from django.contrib import admin
 
+from helpers.admin import LargeTableAdmin
+from .models import Robot, RobotStock
+
 # Register your models here.
+
+
+class SerialPartFilter(admin.SimpleListFilter):
+    """
+    Filter robots on a part of their serial.
+
+    The choices come from the small stock table rather than from a
+    ``SELECT DISTINCT`` over every robot.
+    """
+
+    part = None
+
+    def lookups(self, request, model_admin):
+        serials = RobotStock.objects.values_list("serial", flat=True)
+        values = sorted({serial.split("-")[self.part] for serial in serials})
+        return [(value, value) for value in values]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class ModelFilter(SerialPartFilter):
+    title = "model"
+    parameter_name = "model"
+    part = 0
+
+
+class VersionFilter(SerialPartFilter):
+    title = "version"
+    parameter_name = "version"
+    part = 1
+
+
+@admin.register(Robot)
+class RobotAdmin(LargeTableAdmin):
+    list_display = ["id", "serial", "model", "version", "created"]
+    # model leads the (model, version, created) index, created has its own
+    list_filter = [ModelFilter, VersionFilter, "created"]
+    search_fields = ["serial__exact"]
+    ordering = ["-id"]
+
+    # Robots are only created through the API, which also records them in the
+    # stock and the daily production and notifies the waitlist; an admin edit
+    # would skip all of that.
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RobotStock)
+class RobotStockAdmin(admin.ModelAdmin):
+    list_display = ["serial", "available"]
+    search_fields = ["serial__exact"]
+    ordering = ["serial"]
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+
+from orders.demand import split_serial
+from .models import RobotStock
+
+logger = logging.getLogger(__name__)
+
+# Events per NOTIFY, keeping payloads well below PostgreSQL's 8000 bytes
+NOTIFY_CHUNK_SIZE = 50
+
+
+def subscription_keys(serials=(), models=()) -> set:
+    return {f"serial:{serial}" for serial in serials} | {
+        f"model:{model}" for model in models
+    }
+
+
+class Subscription:
+    """The queue of availability events of one subscriber."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=settings.AVAILABILITY_QUEUE_SIZE)
+
+    def offer(self, event) -> None:
+        """Queue an event; a subscriber that falls behind misses it."""
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Availability subscriber is full, dropping event %s", event)
+
+
+class AvailabilityBroker:
+    """
+    Fan out availability events to the subscribers of this process.
+
+    Events are published from any thread and delivered on each subscriber's
+    own event loop.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, keys) -> Subscription:
+        """
+        Subscribe the running event loop to serials and models.
+
+        Args:
+            keys (set[str]): The keys from ``subscription_keys``.
+
+        Returns:
+            Subscription: The subscription to read events from.
+        """
+
+        subscription = Subscription(keys)
+        with self.lock:
+            for key in keys:
+                self.subscriptions.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription) -> None:
+        with self.lock:
+            for key in subscription.keys:
+                subscribers = self.subscriptions.get(key, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self.subscriptions.pop(key, None)
+
+    def publish(self, events) -> None:
+        """
+        Deliver events to the subscribers of their serial or model.
+
+        Args:
+            events (Iterable[dict]): Events with ``serial`` and ``model`` keys.
+        """
+
+        for event in events:
+            keys = subscription_keys([event["serial"]], [event["model"]])
+            with self.lock:
+                subscriptions = set().union(
+                    *(self.subscriptions.get(key, ()) for key in keys)
+                )
+            for subscription in subscriptions:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+
+
+broker = AvailabilityBroker()
+
+
+def availability_events(robots) -> list:
+    """
+    Summarize created robots as one event per serial.
+
+    Args:
+        robots (Iterable[Robot]): The created robots.
+
+    Returns:
+        list[dict]: ``{"serial", "model", "version", "produced"}`` events.
+    """
+
+    counts = Counter((robot.serial, robot.model, robot.version) for robot in robots)
+    return [
+        {"serial": serial, "model": model, "version": version, "produced": produced}
+        for (serial, model, version), produced in counts.items()
+    ]
+
+
+def stock_events(keys) -> list:
+    """
+    Describe the robots a subscriber's serials and models already have in stock.
+
+    Subscribers only hear about robots produced after they subscribe, so a
+    client that subscribes once its serial is in stock, or between two long
+    polls, gets these first. Read them after subscribing, so no robot
+    produced in between is missed.
+
+    Args:
+        keys (set[str]): The keys from ``subscription_keys``.
+
+    Returns:
+        list[dict]: ``{"serial", "model", "version", "available"}`` events,
+        one per serial in stock.
+    """
+
+    lookup = Q()
+    for key in keys:
+        kind, value = key.split(":", 1)
+        if kind == "serial":
+            lookup |= Q(serial=value)
+        else:
+            lookup |= Q(serial__startswith=f"{value}-")
+
+    stock = RobotStock.objects.filter(lookup, available__gt=0).order_by("serial")
+    events = []
+    for serial, available in stock.values_list("serial", "available"):
+        model, version = split_serial(serial)
+        events.append(
+            {"serial": serial, "model": model, "version": version, "available": available}
+        )
+    return events
+
+
+def publish_availability(events) -> None:
+    """
+    Publish availability events to every subscriber.
+
+    With ``AVAILABILITY_NOTIFY_CHANNEL`` set on PostgreSQL, the events go out
+    with NOTIFY and every worker's listener delivers them, this one's
+    included; otherwise they only reach the subscribers of this process.
+
+    Args:
+        events (list[dict]): The events from ``availability_events``.
+    """
+
+    channel = settings.AVAILABILITY_NOTIFY_CHANNEL
+    if not channel or connection.vendor != "postgresql":
+        broker.publish(events)
+        return
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(events), NOTIFY_CHUNK_SIZE):
+            payload = json.dumps(events[start : start + NOTIFY_CHUNK_SIZE])
+            cursor.execute("SELECT pg_notify(%s, %s)", [channel, payload])
+
+
+listener_lock = threading.Lock()
+listener_thread = None
+
+
+def listen(channel) -> None:
+    """Relay NOTIFY payloads on a channel to the broker, reconnecting on errors."""
+
+    wrapper = connections["default"]
+    while True:
+        try:
+            listener = wrapper.get_new_connection(wrapper.get_connection_params())
+            listener.autocommit = True
+            with listener.cursor() as cursor:
+                cursor.execute(f"LISTEN {wrapper.ops.quote_name(channel)}")
+            while True:
+                if select.select([listener], [], [], 60) == ([], [], []):
+                    continue
+                listener.poll()
+                while listener.notifies:
+                    notify = listener.notifies.pop(0)
+                    broker.publish(json.loads(notify.payload))
+        except Exception:
+            logger.exception("Availability listener failed, reconnecting")
+            threading.Event().wait(5)
+
+
+def start_listener() -> None:
+    """
+    Start the NOTIFY listener of this process, once.
+
+    It only runs in processes that serve subscribers, and only when
+    ``AVAILABILITY_NOTIFY_CHANNEL`` is set on PostgreSQL.
+    """
+
+    global listener_thread
+    channel = settings.AVAILABILITY_NOTIFY_CHANNEL
+    if not channel or connection.vendor != "postgresql":
+        return
+    with listener_lock:
+        if listener_thread is None:
+            listener_thread = threading.Thread(
+                target=listen, args=(channel,), name="availability-listener", daemon=True
+            )
+            listener_thread.start()
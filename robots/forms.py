@@ -1,8 +1,6 @@
-from django import forms
+from helpers.schemas import Schema
 from .models import Robot
 
 
-class RobotForm(forms.ModelForm):
-    class Meta:
-        model = Robot
-        fields = ["serial", "model", "version", "created"]
+# Fields of a posted robot; the serial is derived from the model and version
+ROBOT_SCHEMA = Schema.for_model(Robot, ["model", "version", "created"])
@@ -0,0 +1,198 @@
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ReportJob
+from .reports import (
+    RANGE_REPORT_HEADERS,
+    REPORT_HEADERS,
+    get_production_summary,
+    render_report,
+    write_report_workbook,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_path(name) -> str:
+    return os.path.join(settings.REPORT_SNAPSHOT_DIR, name)
+
+
+def render_job(job) -> str:
+    """
+    Render a report job to a file in ``REPORT_SNAPSHOT_DIR``.
+
+    The file is written under a temporary name and renamed into place, so a
+    download never sees a half-written report.
+
+    Args:
+        job (ReportJob): The job to render.
+
+    Returns:
+        str: The name of the file, relative to ``REPORT_SNAPSHOT_DIR``.
+    """
+
+    rows = get_production_summary(job.start_date, job.end_date, job.robot_models)
+    name = f"{job.id}.{job.format}"
+    path = snapshot_path(name)
+    os.makedirs(settings.REPORT_SNAPSHOT_DIR, exist_ok=True)
+
+    with open(f"{path}.tmp", "wb") as file:
+        if job.format == ReportJob.Format.XLSX:
+            weekly = job.kind == ReportJob.Kind.WEEKLY
+            write_report_workbook(
+                rows, file, REPORT_HEADERS if weekly else RANGE_REPORT_HEADERS
+            )
+        else:
+            file.write(render_report(rows, job.format))
+    os.replace(f"{path}.tmp", path)
+    return name
+
+
+def claim_next_report_job():
+    """
+    Lease the oldest pending report job to this worker.
+
+    The job is locked with ``SELECT ... FOR UPDATE SKIP LOCKED`` and marked as
+    running in a short transaction of its own, so no lock is held while it is
+    rendered. A job still running ``REPORT_JOB_LEASE`` seconds after it was
+    claimed, because its worker died, is claimed again.
+
+    Returns:
+        ReportJob | None: The claimed job, or None if no job was pending.
+    """
+
+    with transaction.atomic():
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.REPORT_JOB_LEASE)
+        job = (
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ReportJob.Status.PENDING)
+                | Q(status=ReportJob.Status.RUNNING, started_at__lt=stale)
+            )
+            .order_by("created")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = ReportJob.Status.RUNNING
+        job.started_at = now
+        job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def run_next_report_job():
+    """
+    Render the oldest pending report job.
+
+    The job is claimed with ``claim_next_report_job``, so several workers never
+    render the same job, and rendered outside any transaction. Its result is
+    only saved while the lease is still held, so a job that was claimed again
+    meanwhile is finished by its new worker.
+
+    Returns:
+        ReportJob | None: The finished job, or None if no job was pending.
+    """
+
+    job = claim_next_report_job()
+    if job is None:
+        return None
+
+    try:
+        job.file = render_job(job)
+        job.status = ReportJob.Status.DONE
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.id)
+        job.status = ReportJob.Status.FAILED
+        job.error = str(exc)
+    job.finished_at = timezone.now()
+    ReportJob.objects.filter(
+        id=job.id, status=ReportJob.Status.RUNNING, started_at=job.started_at
+    ).update(
+        file=job.file, status=job.status, error=job.error, finished_at=job.finished_at
+    )
+    return job
+
+
+def prune_report_jobs() -> int:
+    """
+    Delete finished report jobs older than ``REPORT_JOB_RETENTION`` seconds.
+
+    Their files are removed from ``REPORT_SNAPSHOT_DIR`` first, so the
+    directory does not grow with every report ever rendered.
+
+    Returns:
+        int: The number of deleted jobs.
+    """
+
+    cutoff = timezone.now() - timedelta(seconds=settings.REPORT_JOB_RETENTION)
+    expired = list(
+        ReportJob.objects.filter(
+            status__in=[ReportJob.Status.DONE, ReportJob.Status.FAILED],
+            finished_at__lt=cutoff,
+        ).values_list("id", "file")
+    )
+    for _, name in expired:
+        if name:
+            try:
+                os.remove(snapshot_path(name))
+            except FileNotFoundError:
+                pass
+    ReportJob.objects.filter(id__in=[pk for pk, _ in expired]).delete()
+    return len(expired)
+
+
+def enqueue_weekly_report(today=None) -> ReportJob:
+    """
+    Queue the weekly report of the last 7 days, including today.
+
+    Args:
+        today (date, optional): The last day of the report. Defaults to today.
+
+    Returns:
+        ReportJob: The queued job, or the one already pending or running for
+        the same days.
+    """
+
+    end_date = today or timezone.localdate()
+    job, _ = ReportJob.objects.get_or_create(
+        kind=ReportJob.Kind.WEEKLY,
+        start_date=end_date - timedelta(days=6),
+        end_date=end_date,
+        status__in=[ReportJob.Status.PENDING, ReportJob.Status.RUNNING],
+        defaults={"status": ReportJob.Status.PENDING},
+    )
+    return job
+
+
+def get_latest_weekly_report(today=None):
+    """
+    Return the most recently rendered weekly report of the current week.
+
+    Only reports ending today count, so a stopped scheduler never leaves an
+    old week being served.
+
+    Args:
+        today (date, optional): The last day of the report. Defaults to today.
+
+    Returns:
+        ReportJob | None: The job, or None if today's report has not been
+        rendered yet.
+    """
+
+    return (
+        ReportJob.objects.filter(
+            kind=ReportJob.Kind.WEEKLY,
+            status=ReportJob.Status.DONE,
+            end_date=today or timezone.localdate(),
+        )
+        .order_by("-finished_at")
+        .first()
+    )
@@ -0,0 +1,288 @@
+import json
+import random
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import WaitlistedOrder
+from robots.models import Robot, RobotStock
+from robots.rollups import rebuild_daily_production
+
+MODELS = ["R2", "C3", "X5", "T1", "BB", "K2", "M0", "S9"]
+
+VERSIONS = ["D2", "PO", "LT", "A1", "B8", "XS", "Z0", "Q7"]
+
+# Serials that are never produced while seeding, used for the waitlist path
+WAITLIST_MODEL = "W1"
+
+
+def summarize(samples) -> dict:
+    latencies = sorted(sample * 1000 for sample in samples)
+    quantiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    return {
+        "iterations": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+        "max_ms": round(latencies[-1], 3),
+        "requests_per_second": round(len(latencies) / sum(samples), 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic robots, customers and "
+        "waitlists and measure the JSON APIs, the reports and the waitlist "
+        "signal end to end with the test client. Prints JSON results. Run it "
+        "with DJANGO_SETTINGS_MODULE=R4C.settings.bench (SQLite, or Postgres "
+        "when DB_NAME is set)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--robots", type=int, default=10000, help="Robots to seed.")
+        parser.add_argument("--customers", type=int, default=1000, help="Customers to seed.")
+        parser.add_argument(
+            "--waiting",
+            type=int,
+            default=100,
+            help="Customers waiting for the serial in the waitlist signal scenario.",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=100, help="Requests timed per scenario."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Robots per batch request."
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the random data and requests, so runs can be compared.",
+        )
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep and reuse the test database (skips seeding if it is not empty).",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            started = time.perf_counter()
+            if not Robot.objects.exists():
+                self.seed(options)
+            seed_time = time.perf_counter() - started
+            results = self.run_scenarios(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        report = {
+            "commit": self.git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "seed": options["seed"],
+            "scale": {
+                "robots": options["robots"],
+                "customers": options["customers"],
+                "waiting": options["waiting"],
+                "iterations": options["iterations"],
+            },
+            "seed_seconds": round(seed_time, 2),
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def log(self, message):
+        self.stderr.write(message)
+
+    def seed(self, options, chunk_size=10000):
+        self.log(f"Seeding {options['customers']} customers")
+        for start in range(0, options["customers"], chunk_size):
+            Customer.objects.bulk_create(
+                Customer(email=f"customer{i}@example.com")
+                for i in range(start, min(start + chunk_size, options["customers"]))
+            )
+
+        self.log(f"Seeding {options['robots']} robots")
+        rng = random.Random(options["seed"])
+        now = timezone.now()
+        for start in range(0, options["robots"], chunk_size):
+            robots = []
+            for _ in range(min(chunk_size, options["robots"] - start)):
+                model = rng.choice(MODELS)
+                version = rng.choice(VERSIONS)
+                robots.append(
+                    Robot(
+                        serial=f"{model}-{version}",
+                        model=model,
+                        version=version,
+                        created=now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+                    )
+                )
+            Robot.objects.bulk_create(robots)
+
+        self.log("Building rollup and stock")
+        rebuild_daily_production()
+        RobotStock.objects.bulk_create(
+            RobotStock(serial=serial, available=count)
+            for serial, count in Robot.objects.values_list("serial")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+
+    def timed(self, name, request, iterations, setup=None):
+        """Time ``request`` over ``iterations`` runs after one untimed run counting queries."""
+
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        if setup:
+            setup(-1)
+        # The test client resets connection.queries on every request
+        with connection.execute_wrapper(count_query):
+            request(-1)
+
+        samples = []
+        for i in range(iterations):
+            if setup:
+                setup(i)
+            started = time.perf_counter()
+            response = request(i)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 500:
+                raise RuntimeError(f"{name} failed with {response.status_code}")
+
+        result = summarize(samples)
+        result["queries"] = len(queries)
+        self.log(f"{name}: {result['p50_ms']} ms p50")
+        return result
+
+    def run_scenarios(self, options):
+        client = Client()
+        # A generator of its own, so --keepdb runs that skip seeding make the same requests
+        rng = random.Random(options["seed"])
+        iterations = options["iterations"]
+        customer_ids = list(Customer.objects.values_list("id", flat=True)[:1000])
+        created = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
+        run = time.time_ns()
+
+        def post(path, data, content_type="application/json"):
+            return client.post(path, data, content_type=content_type)
+
+        def robot(i):
+            return {"model": rng.choice(MODELS), "version": rng.choice(VERSIONS), "created": created}
+
+        def waitlist(i):
+            serial = f"{WAITLIST_MODEL}-{i % 100:02d}"
+            waiting = rng.sample(customer_ids, min(options["waiting"], len(customer_ids)))
+            WaitlistedOrder.objects.bulk_create(
+                WaitlistedOrder(customer_id=customer_id, robot_serial=serial)
+                for customer_id in waiting
+            )
+
+        def weekly_report(i):
+            response = client.get("/download_weekly_report/")
+            b"".join(response.streaming_content)
+            return response
+
+        def range_report(i):
+            cache.clear()
+            start = (timezone.localdate() - timedelta(days=365)).isoformat()
+            end = timezone.localdate().isoformat()
+            return client.get(f"/api/reports/production/?start={start}&end={end}&format=xlsx")
+
+        batch = [robot(i) for i in range(options["batch_size"])]
+        return {
+            "post_robot": self.timed(
+                "post_robot",
+                lambda i: post("/api/robots/", json.dumps(robot(i))),
+                iterations,
+            ),
+            "post_robot_batch": self.timed(
+                "post_robot_batch",
+                lambda i: post("/api/robots/", json.dumps(batch)),
+                max(iterations // 10, 1),
+            ),
+            "post_order": self.timed(
+                "post_order",
+                lambda i: post(
+                    "/api/orders/",
+                    json.dumps(
+                        {
+                            "customer": rng.choice(customer_ids),
+                            "robot_serial": f"{rng.choice(MODELS)}-{rng.choice(VERSIONS)}",
+                        }
+                    ),
+                ),
+                iterations,
+            ),
+            "post_order_waitlisted": self.timed(
+                "post_order_waitlisted",
+                lambda i: post(
+                    "/api/orders/",
+                    json.dumps({"customer": rng.choice(customer_ids), "robot_serial": "ZZ-ZZ"}),
+                ),
+                iterations,
+            ),
+            "post_customer": self.timed(
+                "post_customer",
+                lambda i: post(
+                    "/api/customers/", json.dumps({"email": f"bench{run}-{i}@example.com"})
+                ),
+                iterations,
+            ),
+            "generate_weekly_report": self.timed(
+                "generate_weekly_report", weekly_report, max(iterations // 10, 1)
+            ),
+            "production_report_uncached": self.timed(
+                "production_report_uncached", range_report, max(iterations // 10, 1)
+            ),
+            "waitlist_signal": self.timed(
+                "waitlist_signal",
+                lambda i: post(
+                    "/api/robots/",
+                    json.dumps(
+                        {"model": WAITLIST_MODEL, "version": f"{i % 100:02d}", "created": created}
+                    ),
+                ),
+                iterations,
+                setup=waitlist,
+            ),
+        }
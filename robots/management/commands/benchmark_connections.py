@@ -0,0 +1,76 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+from .benchmark import summarize
+
+# CONN_MAX_AGE and CONN_HEALTH_CHECKS of every measured mode
+MODES = {
+    "per_request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": False},
+    "persistent_health_checks": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the database cost of a request with connections opened per "
+        "request and with persistent connections, with and without health "
+        "checks. Each request runs Django's request signals around a single "
+        "SELECT 1, so the difference is the connection setup. Prints JSON "
+        "results. Run it against the production database settings, where "
+        "the TCP and authentication handshake is paid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Requests to simulate per mode."
+        )
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS, help="Database alias to measure."
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        original = {key: connection.settings_dict[key] for key in MODES["persistent"]}
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        results = {}
+        try:
+            for mode, conn_settings in MODES.items():
+                connection.close()
+                connection.settings_dict.update(conn_settings)
+                opened.clear()
+                samples = self.measure(connection, options["requests"])
+                results[mode] = {
+                    **conn_settings,
+                    "connections_opened": len(opened),
+                    **summarize(samples),
+                }
+                self.stderr.write(f"Measured {mode}")
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+            connection.settings_dict.update(original)
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def measure(self, connection, requests) -> list:
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            samples.append(time.perf_counter() - started)
+        return samples
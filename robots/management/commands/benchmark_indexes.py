@@ -0,0 +1,140 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order, WaitlistedOrder
+from robots.models import Robot
+
+MODELS = ["R2", "C3", "X5", "T1", "BB"]
+
+VERSIONS = ["D2", "PO", "LT", "A1", "B8"]
+
+# Leading columns of the indexes under test
+INDEXED_COLUMNS = {
+    Robot: {"serial", "created", "model"},
+    Order: {"robot_serial"},
+    WaitlistedOrder: {"robot_serial"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure lookup and report latency at growing table sizes, with and "
+        "without the indexes on the hot lookup columns. Everything runs in a "
+        "transaction that is rolled back, leaving the database unchanged."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000, 100000],
+            help="Row counts to measure at, in increasing order.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of times each query is timed.",
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        with transaction.atomic():
+            customer = Customer.objects.create(email="benchmark@example.com")
+            seeded = 0
+            for size in sorted(options["sizes"]):
+                self.seed(customer, size - seeded)
+                seeded = size
+                self.analyze()
+
+                after = self.measure(options["repeat"])
+                sid = transaction.savepoint()
+                self.drop_indexes()
+                before = self.measure(options["repeat"])
+                transaction.savepoint_rollback(sid)
+
+                results.append({"rows": size, "before": before, "after": after})
+                self.stderr.write(f"Measured {size} rows")
+            transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def seed(self, customer, count, batch_size=5000):
+        now = timezone.now()
+        for start in range(0, count, batch_size):
+            robots = []
+            waitlist = []
+            orders = []
+            for _ in range(min(batch_size, count - start)):
+                model = random.choice(MODELS)
+                version = random.choice(VERSIONS)
+                serial = f"{model}-{version}"
+                created = now - timedelta(minutes=random.randrange(60 * 24 * 365))
+                robots.append(
+                    Robot(serial=serial, model=model, version=version, created=created)
+                )
+                orders.append(Order(customer=customer, robot_serial=serial))
+                waitlist.append(WaitlistedOrder(customer=customer, robot_serial=serial))
+            Robot.objects.bulk_create(robots)
+            Order.objects.bulk_create(orders)
+            WaitlistedOrder.objects.bulk_create(waitlist)
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model, columns in INDEXED_COLUMNS.items():
+                constraints = connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                )
+                for name, constraint in constraints.items():
+                    if constraint["index"] and constraint["columns"][0] in columns:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    def measure(self, repeat):
+        now = timezone.now()
+        day_ago = now - timedelta(days=1)
+        queries = {
+            # A serial that was never produced must be looked up to the end
+            "robot_by_missing_serial": lambda: Robot.objects.filter(
+                serial="ZZ-ZZ"
+            ).first(),
+            "order_by_missing_serial": lambda: Order.objects.filter(
+                robot_serial="ZZ-ZZ"
+            ).exists(),
+            "waitlist_by_serial": lambda: list(
+                WaitlistedOrder.objects.filter(robot_serial="X5-LT").values_list(
+                    "id", flat=True
+                )[:100]
+            ),
+            "report_last_day": lambda: list(
+                Robot.objects.filter(created__range=(day_ago, now))
+                .values_list("model", "version")
+                .annotate(count=Count("id"))
+                .order_by("model", "version")
+            ),
+        }
+        timings = {}
+        for name, query in queries.items():
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                query()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = {
+                "median_ms": round(statistics.median(samples), 3),
+                "max_ms": round(max(samples), 3),
+            }
+        return timings
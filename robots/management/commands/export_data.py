@@ -0,0 +1,57 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from helpers.exports import EXPORT_CONTENT_TYPES, filter_export, iter_export, parse_moment
+from orders.models import Order, WaitlistedOrder
+from orders.views import ORDER_EXPORT_FIELDS
+from robots.models import Robot
+from robots.views import ROBOT_EXPORT_FIELDS
+
+# Exported rows, their fields and the field filtered by --model, by table
+EXPORTS = {
+    "robots": (Robot, ROBOT_EXPORT_FIELDS, "model"),
+    "orders": (Order, ORDER_EXPORT_FIELDS, "robot_serial"),
+    "waitlist": (WaitlistedOrder, ORDER_EXPORT_FIELDS, "robot_serial"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream robots, orders or the waitlist as NDJSON or CSV to a file or "
+        "to stdout, at constant memory whatever the number of rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("table", choices=EXPORTS, help="What to export.")
+        parser.add_argument(
+            "--format", choices=EXPORT_CONTENT_TYPES, default="ndjson", help="Output format."
+        )
+        parser.add_argument(
+            "--start", help="Only rows created at or after this date or datetime."
+        )
+        parser.add_argument("--end", help="Only rows created before this date or datetime.")
+        parser.add_argument(
+            "--model", action="append", default=[], help="Only this model; may be repeated."
+        )
+        parser.add_argument("--chunk-size", type=int, help="Rows per database fetch.")
+        parser.add_argument("--output", help="File to write to instead of stdout.")
+
+    def handle(self, *args, **options):
+        model, fields, model_field = EXPORTS[options["table"]]
+        try:
+            start = parse_moment(options["start"]) if options["start"] else None
+            end = parse_moment(options["end"]) if options["end"] else None
+        except ValueError as error:
+            raise CommandError(f"Dates must be in ISO 8601 format: {error}")
+
+        queryset = filter_export(
+            model.objects.all(), model_field, start, end, sorted(set(options["model"]))
+        )
+        chunks = iter_export(queryset, fields, options["format"], options["chunk_size"])
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as file:
+                file.writelines(chunks)
+        else:
+            sys.stdout.writelines(chunks)
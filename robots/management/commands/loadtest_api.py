@@ -0,0 +1,102 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+PAYLOADS = {
+    "robots": lambda i, options: {
+        "model": "R2",
+        "version": "D2",
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    },
+    "customers": lambda i, options: {"email": f"loadtest{time.time_ns()}{i}@example.com"},
+    "orders": lambda i, options: {
+        "customer": options["customer"],
+        "robot_serial": options["serial"],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a running server's JSON APIs and report requests/sec and "
+        "latency percentiles as JSON. Compare the WSGI path against the ASGI "
+        "one, e.g. `gunicorn R4C.wsgi` with --prefix api/ and "
+        "`uvicorn R4C.asgi:application` with --prefix api/async/. Orders "
+        "reserve the robots posted by a robots run first and waitlist the "
+        "customer once they are out of stock, answering 400."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000/",
+            help="Base URL of the running server.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="api/",
+            help="Path prefix of the endpoints, api/ (sync) or api/async/ (async).",
+        )
+        parser.add_argument(
+            "--endpoint",
+            choices=sorted(PAYLOADS),
+            default="robots",
+            help="Endpoint to post to.",
+        )
+        parser.add_argument(
+            "--customer",
+            type=int,
+            default=1,
+            help="Id of the existing customer placing the orders.",
+        )
+        parser.add_argument(
+            "--serial", default="R2-D2", help="Serial of the robots ordered."
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=32)
+
+    def handle(self, *args, **options):
+        url = f"{options['url'].rstrip('/')}/{options['prefix'].strip('/')}/{options['endpoint']}/"
+        payload = PAYLOADS[options["endpoint"]]
+
+        def post(i):
+            request = urllib.request.Request(
+                url,
+                data=json.dumps(payload(i, options)).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(post, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        quantiles = statistics.quantiles(latencies, n=100)
+        report = {
+            "url": url,
+            "requests": len(results),
+            "concurrency": options["concurrency"],
+            "errors": sum(1 for _, status in results if status >= 400),
+            "statuses": dict(sorted(Counter(status for _, status in results).items())),
+            "requests_per_second": round(len(results) / elapsed, 1),
+            "p50_ms": round(quantiles[49], 2),
+            "p99_ms": round(quantiles[98], 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
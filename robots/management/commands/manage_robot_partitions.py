@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from robots.partitions import (
+    ARCHIVE_SCHEMA,
+    archive_partitions,
+    ensure_partitions,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the robots table ahead of time, and "
+        "detach the partitions of old months into the robots_archive schema. "
+        "PostgreSQL only. Archived robots no longer count when the production "
+        "rollup is rebuilt, so only rebuild it over the months that are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.ROBOT_PARTITIONS_AHEAD,
+            help="Months after the current one to create partitions for.",
+        )
+        parser.add_argument(
+            "--archive-before",
+            help="Detach the partitions of the months before this one, YYYY-MM.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the detached partitions instead of archiving them.",
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError(
+                "The robots table is not partitioned; partitioning needs PostgreSQL."
+            )
+
+        for name in ensure_partitions(options["ahead"]):
+            self.stdout.write(f"Created partition {name}")
+
+        if options["archive_before"]:
+            try:
+                before = date.fromisoformat(f"{options['archive_before']}-01")
+            except ValueError:
+                raise CommandError("--archive-before must be in YYYY-MM format.")
+
+            for name in archive_partitions(before, drop=options["drop"]):
+                if options["drop"]:
+                    self.stdout.write(f"Dropped partition {name}")
+                else:
+                    self.stdout.write(f"Archived partition {name} to {ARCHIVE_SCHEMA}")
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from robots.jobs import prune_report_jobs, run_next_report_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Render queued report jobs to files on disk, polling for new ones, and "
+        "delete the jobs and files older than REPORT_JOB_RETENTION."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.REPORT_JOB_POLL_INTERVAL,
+            help="Seconds to wait before polling again once the queue is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        pruned_at = None
+        try:
+            while True:
+                now = time.monotonic()
+                interval = settings.REPORT_JOB_PRUNE_INTERVAL
+                if pruned_at is None or now - pruned_at >= interval:
+                    pruned = prune_report_jobs()
+                    if pruned:
+                        self.stdout.write(f"Pruned {pruned} report job(s)")
+                    pruned_at = now
+
+                job = run_next_report_job()
+                if job is not None:
+                    self.stdout.write(f"Report job {job.id}: {job.status}")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
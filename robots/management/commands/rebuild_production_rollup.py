@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from robots.reports import invalidate_report_cache
+from robots.rollups import rebuild_daily_production
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily production rollup from the robots table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to rebuild (YYYY-MM-DD). Defaults to the beginning of history.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to rebuild (YYYY-MM-DD). Defaults to the end of history.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rollup rows inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_daily_production(
+            options["start"], options["end"], batch_size=options["batch_size"]
+        )
+        invalidate_report_cache()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily production row(s)."))
@@ -0,0 +1,54 @@
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from robots.jobs import enqueue_weekly_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the weekly report every day at a fixed local time, so the "
+        "report worker has it rendered before anyone downloads it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--at",
+            default=settings.WEEKLY_REPORT_TIME,
+            help="Local time of day to queue the report at, HH:MM.",
+        )
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="Queue the report once right away and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["now"]:
+            job = enqueue_weekly_report()
+            self.stdout.write(f"Queued weekly report job {job.id}")
+            return
+
+        try:
+            at = datetime.strptime(options["at"], "%H:%M").time()
+        except ValueError:
+            raise CommandError("--at must be in HH:MM format.")
+
+        try:
+            while True:
+                now = timezone.localtime()
+                next_run = timezone.make_aware(datetime.combine(now.date(), at))
+                if next_run <= now:
+                    next_run = timezone.make_aware(
+                        datetime.combine(now.date() + timedelta(days=1), at)
+                    )
+                self.stdout.write(f"Next weekly report at {next_run}")
+                time.sleep((next_run - now).total_seconds())
+
+                job = enqueue_weekly_report()
+                self.stdout.write(f"Queued weekly report job {job.id}")
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:24
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_production(apps, schema_editor, batch_size=1000):
+    """Count the robots produced so far, like ``rebuild_daily_production``."""
+
+    Robot = apps.get_model("robots", "Robot")
+    DailyProduction = apps.get_model("robots", "DailyProduction")
+
+    rows = (
+        Robot.objects.annotate(day=TruncDate("created"))
+        .values_list("day", "model", "version")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    DailyProduction.objects.bulk_create(
+        (
+            DailyProduction(day=day, model=model, version=version, count=count)
+            for day, model, version, count in rows.iterator()
+        ),
+        batch_size=batch_size,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0002_alter_robot_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProduction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('model', models.CharField(max_length=2)),
+                ('version', models.CharField(max_length=2)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproduction',
+            constraint=models.UniqueConstraint(fields=('day', 'model', 'version'), name='unique_daily_production'),
+        ),
+        migrations.RunPython(backfill_daily_production, migrations.RunPython.noop),
+    ]
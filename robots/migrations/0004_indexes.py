@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0003_dailyproduction'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='robot',
+            name='created',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='robot',
+            name='serial',
+            field=models.CharField(db_index=True, max_length=5),
+        ),
+        migrations.AddIndex(
+            model_name='robot',
+            index=models.Index(fields=['model', 'version', 'created'], name='robot_model_version_created'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:28
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stock(apps, schema_editor):
+    """Robots of a serial that were not ordered yet are in stock."""
+
+    Robot = apps.get_model("robots", "Robot")
+    Order = apps.get_model("orders", "Order")
+    RobotStock = apps.get_model("robots", "RobotStock")
+
+    produced = dict(
+        Robot.objects.values_list("serial").annotate(count=Count("id")).order_by()
+    )
+    ordered = dict(
+        Order.objects.values_list("robot_serial").annotate(count=Count("id")).order_by()
+    )
+    RobotStock.objects.bulk_create(
+        RobotStock(serial=serial, available=max(count - ordered.get(serial, 0), 0))
+        for serial, count in produced.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+        ('robots', '0004_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RobotStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('serial', models.CharField(max_length=5, unique=True)),
+                ('available', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0005_robotstock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('weekly', 'Weekly'), ('range', 'Range')], default='range', max_length=6)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('robot_models', models.JSONField(blank=True, default=list)),
+                ('format', models.CharField(choices=[('xlsx', 'Xlsx'), ('csv', 'Csv'), ('json', 'Json')], default='xlsx', max_length=4)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=7)),
+                ('file', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created'], name='report_job_queue_idx'), models.Index(fields=['kind', 'status', 'finished_at'], name='report_job_latest_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,171 @@
+from datetime import datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+# Monthly partitions created past the current month
+MONTHS_AHEAD = 3
+
+
+def month_bound(year, month):
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return timezone.make_aware(datetime(year, month, 1)).isoformat()
+
+
+def index_definitions(cursor, table):
+    cursor.execute(
+        """
+        SELECT indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = %s
+        AND indexname <> %s
+        """,
+        [table, f"{table}_pkey"],
+    )
+    return [definition.replace(" ON ONLY ", " ON ") for (definition,) in cursor.fetchall()]
+
+
+def partition_robots(apps, schema_editor):
+    """
+    Turn robots_robot into a table partitioned by month on created.
+
+    The primary key of a partitioned table must contain the partition key, so
+    it becomes (id, created); ids still come from the robots_robot_id_seq
+    sequence. Existing rows are copied into monthly partitions, and a default
+    partition catches robots of months without one.
+
+    The migration runs in one transaction that holds an ACCESS EXCLUSIVE lock
+    on robots_robot from the first rename to the commit, so every read and
+    write of robots waits while all rows are copied and the indexes rebuilt.
+    A million robots took about 11 seconds on a local PostgreSQL 16; on a
+    large table run it in a maintenance window, or set lock_timeout so it
+    fails instead of queueing behind long transactions.
+    """
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes = index_definitions(cursor, "robots_robot")
+        cursor.execute("SELECT min(created), max(id) FROM robots_robot")
+        first, last_id = cursor.fetchone()
+
+        cursor.execute("ALTER TABLE robots_robot RENAME TO robots_robot_unpartitioned")
+        cursor.execute(
+            "ALTER INDEX robots_robot_pkey RENAME TO robots_robot_unpartitioned_pkey"
+        )
+        # The id column is an identity column, or a serial on older databases
+        cursor.execute(
+            "ALTER TABLE robots_robot_unpartitioned ALTER COLUMN id DROP IDENTITY IF EXISTS"
+        )
+        cursor.execute("ALTER TABLE robots_robot_unpartitioned ALTER COLUMN id DROP DEFAULT")
+        cursor.execute("DROP SEQUENCE IF EXISTS robots_robot_id_seq")
+
+        cursor.execute("CREATE SEQUENCE robots_robot_id_seq")
+        cursor.execute(
+            """
+            CREATE TABLE robots_robot (
+                id bigint NOT NULL DEFAULT nextval('robots_robot_id_seq'),
+                serial varchar(5) NOT NULL,
+                model varchar(2) NOT NULL,
+                version varchar(2) NOT NULL,
+                created timestamp with time zone NOT NULL,
+                CONSTRAINT robots_robot_pkey PRIMARY KEY (id, created)
+            ) PARTITION BY RANGE (created)
+            """
+        )
+        cursor.execute("ALTER SEQUENCE robots_robot_id_seq OWNED BY robots_robot.id")
+        cursor.execute("CREATE TABLE robots_robot_default PARTITION OF robots_robot DEFAULT")
+
+        today = timezone.localdate()
+        start = timezone.localtime(first).date() if first else today
+        month = start.year * 12 + start.month - 1
+        last_month = today.year * 12 + today.month - 1 + MONTHS_AHEAD
+        while month <= last_month:
+            year, month_of_year = divmod(month, 12)
+            name = f"robots_robot_p{year:04d}_{month_of_year + 1:02d}"
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF robots_robot FOR VALUES FROM (%s) TO (%s)",
+                [
+                    month_bound(year, month_of_year + 1),
+                    month_bound(year, month_of_year + 2),
+                ],
+            )
+            month += 1
+
+        cursor.execute(
+            """
+            INSERT INTO robots_robot (id, serial, model, version, created)
+            SELECT id, serial, model, version, created FROM robots_robot_unpartitioned
+            """
+        )
+        cursor.execute(
+            "SELECT setval('robots_robot_id_seq', %s, false)", [(last_id or 0) + 1]
+        )
+        cursor.execute("DROP TABLE robots_robot_unpartitioned")
+
+        # Indexes on the partitioned table are created on every partition
+        for definition in indexes:
+            cursor.execute(definition)
+        cursor.execute("ANALYZE robots_robot")
+
+
+def unpartition_robots(apps, schema_editor):
+    """
+    Turn robots_robot back into a single table keyed by id.
+
+    Every row is copied back with its id and the identity continues after the
+    highest one; partitions of archived months that were detached or dropped
+    are not restored. Like the forward migration, it holds an ACCESS
+    EXCLUSIVE lock on robots_robot for the whole copy.
+    """
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes = index_definitions(cursor, "robots_robot")
+        cursor.execute("SELECT max(id) FROM robots_robot")
+        (last_id,) = cursor.fetchone()
+
+        cursor.execute("ALTER TABLE robots_robot RENAME TO robots_robot_partitioned")
+        cursor.execute("ALTER INDEX robots_robot_pkey RENAME TO robots_robot_partitioned_pkey")
+        cursor.execute("ALTER TABLE robots_robot_partitioned ALTER COLUMN id DROP DEFAULT")
+        cursor.execute("DROP SEQUENCE robots_robot_id_seq")
+
+        cursor.execute(
+            """
+            CREATE TABLE robots_robot (
+                id bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+                serial varchar(5) NOT NULL,
+                model varchar(2) NOT NULL,
+                version varchar(2) NOT NULL,
+                created timestamp with time zone NOT NULL,
+                CONSTRAINT robots_robot_pkey PRIMARY KEY (id)
+            )
+            """
+        )
+        cursor.execute(
+            """
+            INSERT INTO robots_robot (id, serial, model, version, created)
+            SELECT id, serial, model, version, created FROM robots_robot_partitioned
+            """
+        )
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence('robots_robot', 'id'), %s, false)",
+            [(last_id or 0) + 1],
+        )
+        cursor.execute("DROP TABLE robots_robot_partitioned CASCADE")
+
+        for definition in indexes:
+            cursor.execute(definition)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("robots", "0006_reportjob"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_robots, unpartition_robots),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('robots', '0007_partition_robots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=7),
+        ),
+    ]
@@ -2,7 +2,82 @@ from django.db import models
 
 
 class Robot(models.Model):
-    serial = models.CharField(max_length=5, blank=False, null=False)
+    # On PostgreSQL the table is partitioned by month on created, with
+    # (id, created) as its primary key; see robots.partitions.
+    serial = models.CharField(max_length=5, blank=False, null=False, db_index=True)
     model = models.CharField(max_length=2, blank=False, null=False)
     version = models.CharField(max_length=2, blank=False, null=False)
-    created = models.DateTimeField(blank=False, null=False)
+    created = models.DateTimeField(blank=False, null=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["model", "version", "created"],
+                name="robot_model_version_created",
+            )
+        ]
+
+
+class DailyProduction(models.Model):
+    """Number of robots of a model and version produced on a given day."""
+
+    day = models.DateField(blank=False, null=False)
+    model = models.CharField(max_length=2, blank=False, null=False)
+    version = models.CharField(max_length=2, blank=False, null=False)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "model", "version"],
+                name="unique_daily_production",
+            )
+        ]
+
+
+class RobotStock(models.Model):
+    """Number of robots of a serial that are available for new orders."""
+
+    serial = models.CharField(max_length=5, blank=False, null=False, unique=True)
+    available = models.PositiveIntegerField(default=0)
+
+
+class ReportJob(models.Model):
+    """A production report rendered to a file on disk by the report worker."""
+
+    class Kind(models.TextChoices):
+        WEEKLY = "weekly"
+        RANGE = "range"
+
+    class Format(models.TextChoices):
+        XLSX = "xlsx"
+        CSV = "csv"
+        JSON = "json"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    kind = models.CharField(max_length=6, choices=Kind.choices, default=Kind.RANGE)
+    start_date = models.DateField(blank=False, null=False)
+    end_date = models.DateField(blank=False, null=False)
+    robot_models = models.JSONField(default=list, blank=True)
+    format = models.CharField(max_length=4, choices=Format.choices, default=Format.XLSX)
+    status = models.CharField(
+        max_length=7, choices=Status.choices, default=Status.PENDING
+    )
+    file = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created"], name="report_job_queue_idx"),
+            models.Index(
+                fields=["kind", "status", "finished_at"], name="report_job_latest_idx"
+            ),
+        ]
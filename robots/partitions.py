@@ -0,0 +1,186 @@
+import re
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Robot
+
+# Detached partitions are moved here unless they are dropped
+ARCHIVE_SCHEMA = "robots_archive"
+
+PARTITION_PATTERN = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def add_months(month, months) -> date:
+    """
+    Return the first day of the month ``months`` after ``month``.
+
+    Args:
+        month (date): Any day of the starting month.
+        months (int): The number of months to move forward, or back if negative.
+
+    Returns:
+        date: The first day of the resulting month.
+    """
+
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month) -> str:
+    return f"{Robot._meta.db_table}_p{month:%Y_%m}"
+
+
+def partition_month(name):
+    """
+    Return the month a partition holds, from its name.
+
+    Args:
+        name (str): The name of the partition table.
+
+    Returns:
+        date | None: The first day of the month, or None for the default partition.
+    """
+
+    match = PARTITION_PATTERN.search(name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def month_bound(month) -> datetime:
+    """Midnight at the start of a month in the current time zone."""
+
+    return timezone.make_aware(datetime(month.year, month.month, 1))
+
+
+def is_partitioned() -> bool:
+    """
+    Tell whether the robots table is partitioned.
+
+    Returns:
+        bool: True on PostgreSQL once the partitioning migration has run.
+    """
+
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [Robot._meta.db_table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions() -> list:
+    """
+    List the partitions attached to the robots table.
+
+    Returns:
+        list[str]: The names of the partitions, the default one included.
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            ORDER BY child.relname
+            """,
+            [Robot._meta.db_table],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def create_partition(month) -> bool:
+    """
+    Create the partition holding the robots created in a month.
+
+    Args:
+        month (date): Any day of the month.
+
+    Returns:
+        bool: True if the partition was created, False if it already existed.
+    """
+
+    month = month.replace(day=1)
+    name = partition_name(month)
+    if name in list_partitions():
+        return False
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} PARTITION OF {quote(Robot._meta.db_table)} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            [
+                month_bound(month).isoformat(),
+                month_bound(add_months(month, 1)).isoformat(),
+            ],
+        )
+    return True
+
+
+@transaction.atomic
+def ensure_partitions(months_ahead, today=None) -> list:
+    """
+    Create the partitions of the current month and of the months ahead.
+
+    Partitions must exist before robots of their month arrive; robots without
+    one land in the default partition, which then blocks creating it.
+
+    Args:
+        months_ahead (int): The number of months after the current one.
+        today (date, optional): The current day. Defaults to today.
+
+    Returns:
+        list[str]: The names of the partitions that were created.
+    """
+
+    current = (today or timezone.localdate()).replace(day=1)
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    return [partition_name(month) for month in months if create_partition(month)]
+
+
+@transaction.atomic
+def archive_partitions(before, drop=False) -> list:
+    """
+    Detach the partitions of the months before a given one.
+
+    Detached partitions are moved to the ``robots_archive`` schema, where they
+    can still be queried or dumped, or dropped. The daily production rollup is
+    left alone, so reports over archived months keep working.
+
+    Args:
+        before (date): Any day of the first month to keep.
+        drop (bool, optional): Drop the detached partitions instead of archiving them.
+
+    Returns:
+        list[str]: The names of the detached partitions.
+    """
+
+    before = before.replace(day=1)
+    names = [
+        name
+        for name in list_partitions()
+        if partition_month(name) is not None and partition_month(name) < before
+    ]
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if names and not drop:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote(ARCHIVE_SCHEMA)}")
+        for name in names:
+            cursor.execute(
+                f"ALTER TABLE {quote(Robot._meta.db_table)} DETACH PARTITION {quote(name)}"
+            )
+            if drop:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+            else:
+                cursor.execute(
+                    f"ALTER TABLE {quote(name)} SET SCHEMA {quote(ARCHIVE_SCHEMA)}"
+                )
+    return names
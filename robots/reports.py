@@ -0,0 +1,240 @@
+import csv
+import hashlib
+import io
+import json
+from itertools import groupby
+from operator import itemgetter
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .models import DailyProduction
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+REPORT_HEADERS = ("Модель", "Версия", "Количество за неделю")
+
+RANGE_REPORT_HEADERS = ("Модель", "Версия", "Количество")
+
+DEMAND_SHEET_TITLE = "Спрос"
+
+DEMAND_HEADERS = ("Серийный номер", "Модель", "Версия", "Ожидают", "Ожидают с")
+
+REPORT_CONTENT_TYPES = {
+    "xlsx": XLSX_CONTENT_TYPE,
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+REPORT_CACHE_PREFIX = "robots:report"
+
+# Cached ranges embed generation counters in their keys; bumping a counter
+# makes every report that depends on it unreachable without enumerating keys.
+OPEN_GENERATION_KEY = f"{REPORT_CACHE_PREFIX}:generation:open"
+HISTORY_GENERATION_KEY = f"{REPORT_CACHE_PREFIX}:generation:history"
+
+
+def get_production_summary(start_date, end_date, models=None):
+    """
+    Count the robots produced in a range of days, per model and version.
+
+    Args:
+        start_date (date): The first day of the range (inclusive).
+        end_date (date): The last day of the range (inclusive).
+        models (Iterable[str], optional): Only count these models. Defaults to all models.
+
+    Returns:
+        Iterator[tuple]: ``(model, version, count)`` rows ordered by model and
+        version, produced by a single ``GROUP BY model, version`` query over
+        the daily production rollup.
+    """
+
+    rollups = DailyProduction.objects.filter(day__range=(start_date, end_date))
+    if models:
+        rollups = rollups.filter(model__in=models)
+    return (
+        rollups.values_list("model", "version")
+        .annotate(count=Sum("count"))
+        .order_by("model", "version")
+        .iterator()
+    )
+
+
+def write_report_workbook(rows, file, headers=REPORT_HEADERS, demand=None) -> None:
+    """
+    Write production summary rows to an Excel workbook, one sheet per model.
+
+    The workbook is built in openpyxl's write-only mode, so rows are flushed
+    as they are appended instead of being kept in memory.
+
+    Args:
+        rows (Iterable[tuple]): ``(model, version, count)`` rows ordered by model.
+        file: A writable binary file object the workbook is saved to.
+        headers (tuple): The header row of every sheet.
+        demand (Iterable[tuple], optional): ``(serial, model, version, waiting,
+            oldest_wait)`` rows from ``orders.demand.get_demand``, written to an
+            extra sheet after the production ones.
+    """
+
+    wb = Workbook(write_only=True)
+    for model, model_rows in groupby(rows, key=itemgetter(0)):
+        ws = wb.create_sheet(title=model)
+        ws.append(headers)
+        for row in model_rows:
+            ws.append(row)
+
+    if not wb.worksheets:
+        # A workbook needs at least one sheet; keep the headers for an empty range
+        ws = wb.create_sheet()
+        ws.append(headers)
+
+    if demand is not None:
+        ws = wb.create_sheet(title=DEMAND_SHEET_TITLE)
+        ws.append(DEMAND_HEADERS)
+        for *row, oldest_wait in demand:
+            # Excel has no time zones; write the local time
+            if oldest_wait is not None:
+                oldest_wait = timezone.localtime(oldest_wait).replace(tzinfo=None)
+            ws.append((*row, oldest_wait))
+
+    wb.save(file)
+
+
+def render_report_file(rows, headers=REPORT_HEADERS, demand=None) -> SpooledTemporaryFile:
+    """
+    Render production summary rows to a spooled temporary Excel file.
+
+    Small reports stay in memory, larger ones spill over to disk once they
+    exceed ``REPORT_SPOOL_MAX_SIZE`` bytes.
+
+    Args:
+        rows (Iterable[tuple]): ``(model, version, count)`` rows ordered by model.
+        headers (tuple): The header row of every sheet.
+        demand (Iterable[tuple], optional): Rows for an extra demand sheet.
+
+    Returns:
+        SpooledTemporaryFile: The rendered file, rewound to its start.
+    """
+
+    file = SpooledTemporaryFile(max_size=settings.REPORT_SPOOL_MAX_SIZE)
+    write_report_workbook(rows, file, headers, demand)
+    file.seek(0)
+    return file
+
+
+def render_report(rows, report_format) -> bytes:
+    """
+    Render production summary rows in one of ``REPORT_CONTENT_TYPES``.
+
+    Args:
+        rows (Iterable[tuple]): ``(model, version, count)`` rows ordered by model.
+        report_format (str): One of ``"xlsx"``, ``"csv"`` or ``"json"``.
+
+    Returns:
+        bytes: The rendered report.
+    """
+
+    if report_format == "xlsx":
+        with render_report_file(rows, RANGE_REPORT_HEADERS) as file:
+            return file.read()
+
+    if report_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(RANGE_REPORT_HEADERS)
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    data = [
+        {"model": model, "version": version, "count": count}
+        for model, version, count in rows
+    ]
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def get_cached_report(start_date, end_date, models, report_format) -> bytes:
+    """
+    Return a rendered production report, rendering it only on a cache miss.
+
+    The cache key is built from the normalized range, model filter and format;
+    the models are hashed as a JSON list, so a model containing a comma never
+    shares a key with a list of models.
+    Ranges that end before today cannot change anymore and are cached for
+    ``REPORT_CACHE_TIMEOUT`` seconds; ranges that include the open day are
+    cached for ``REPORT_OPEN_CACHE_TIMEOUT`` seconds and are invalidated by
+    ``invalidate_report_cache`` whenever robots are created.
+
+    Args:
+        start_date (date): The first day of the range (inclusive).
+        end_date (date): The last day of the range (inclusive).
+        models (list[str]): Only count these models; an empty list means all models.
+        report_format (str): One of ``"xlsx"``, ``"csv"`` or ``"json"``.
+
+    Returns:
+        bytes: The rendered report.
+    """
+
+    is_open = end_date >= timezone.localdate()
+    generations = cache.get_many([HISTORY_GENERATION_KEY, OPEN_GENERATION_KEY])
+    history_generation = generations.get(HISTORY_GENERATION_KEY, 0)
+    open_generation = generations.get(OPEN_GENERATION_KEY, 0) if is_open else "closed"
+
+    models_digest = hashlib.sha256(
+        json.dumps(sorted(models)).encode("utf-8")
+    ).hexdigest()
+    key = ":".join(
+        [
+            REPORT_CACHE_PREFIX,
+            str(history_generation),
+            str(open_generation),
+            start_date.isoformat(),
+            end_date.isoformat(),
+            models_digest,
+            report_format,
+        ]
+    )
+    content = cache.get(key)
+    if content is None:
+        rows = get_production_summary(start_date, end_date, models)
+        content = render_report(rows, report_format)
+        timeout = (
+            settings.REPORT_OPEN_CACHE_TIMEOUT
+            if is_open
+            else settings.REPORT_CACHE_TIMEOUT
+        )
+        cache.set(key, content, timeout)
+    return content
+
+
+def bump_generation(key) -> None:
+    """Increment a report cache generation counter, creating it if needed."""
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def invalidate_report_cache(days=None) -> None:
+    """
+    Invalidate cached reports that cover any of the given days.
+
+    Reports that include the open day are invalidated for days from today on;
+    a day in the past (a backdated robot, a rollup rebuild) invalidates every
+    cached report.
+
+    Args:
+        days (Iterable[date], optional): The days whose production changed.
+            Defaults to all days.
+    """
+
+    today = timezone.localdate()
+    days = None if days is None else set(days)
+    if days is None or any(day < today for day in days):
+        bump_generation(HISTORY_GENERATION_KEY)
+    if days is None or any(day >= today for day in days):
+        bump_generation(OPEN_GENERATION_KEY)
@@ -0,0 +1,115 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from helpers.helpers import increment_or_create_many
+from .models import DailyProduction, Robot
+
+
+def production_day(created):
+    """
+    Return the calendar day a robot counts towards in the rollup.
+
+    Args:
+        created (datetime): The creation datetime of the robot.
+
+    Returns:
+        date: The day in the current time zone.
+    """
+
+    if timezone.is_aware(created):
+        return timezone.localdate(created)
+    return created.date()
+
+
+def record_production(robots) -> None:
+    """
+    Update the daily production rollup for newly created robots.
+
+    Robots are aggregated per day, model and version first, so a batch is
+    written with a single upsert rather than one update per robot.
+
+    Args:
+        robots (Iterable[Robot]): The created robots.
+    """
+
+    counts = Counter(
+        (production_day(robot.created), robot.model, robot.version)
+        for robot in robots
+    )
+    increment_or_create_many(DailyProduction, ["day", "model", "version"], "count", counts)
+
+
+def robots_produced(start_day=None, end_day=None):
+    """
+    Select the robots produced in a range of days.
+
+    The range is compared against ``created`` itself rather than its date,
+    so it can use the index on ``created`` and, on PostgreSQL, only scan the
+    monthly partitions of the range.
+
+    Args:
+        start_day (date, optional): The first day (inclusive). Defaults to the beginning of history.
+        end_day (date, optional): The last day (inclusive). Defaults to the end of history.
+
+    Returns:
+        QuerySet: The robots.
+    """
+
+    robots = Robot.objects.all()
+    if start_day is not None:
+        start = timezone.make_aware(datetime.combine(start_day, time.min))
+        robots = robots.filter(created__gte=start)
+    if end_day is not None:
+        end = timezone.make_aware(
+            datetime.combine(end_day + timedelta(days=1), time.min)
+        )
+        robots = robots.filter(created__lt=end)
+    return robots
+
+
+@transaction.atomic
+def rebuild_daily_production(start_day=None, end_day=None, batch_size=1000) -> int:
+    """
+    Recompute the daily production rollup from the robots table.
+
+    Args:
+        start_day (date, optional): The first day to rebuild. Defaults to the beginning of history.
+        end_day (date, optional): The last day to rebuild. Defaults to the end of history.
+        batch_size (int): The number of rollup rows inserted per query.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+
+    rollups = DailyProduction.objects.all()
+    if start_day is not None:
+        rollups = rollups.filter(day__gte=start_day)
+    if end_day is not None:
+        rollups = rollups.filter(day__lte=end_day)
+    rollups.delete()
+
+    robots = robots_produced(start_day, end_day).annotate(day=TruncDate("created"))
+
+    rows = (
+        robots.values_list("day", "model", "version")
+        .annotate(count=Count("id"))
+        .order_by()
+        .iterator()
+    )
+    written = 0
+    batch = []
+    for day, model, version, count in rows:
+        batch.append(
+            DailyProduction(day=day, model=model, version=version, count=count)
+        )
+        if len(batch) >= batch_size:
+            DailyProduction.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    DailyProduction.objects.bulk_create(batch)
+    return written + len(batch)
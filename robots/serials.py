@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from helpers.metrics import Counter
+from .models import RobotStock
+
+CACHE_PREFIX = "robots:serial"
+
+lookups = Counter(
+    "r4c_serial_cache_lookups_total",
+    "Serial existence lookups by where they were answered: local, shared or database.",
+)
+
+# serial -> monotonic time until which the process trusts it exists
+local_serials = {}
+warm_lock = threading.Lock()
+warmed = False
+
+
+def cache_key(serial) -> str:
+    return f"{CACHE_PREFIX}:{serial}"
+
+
+def remember_serials(serials) -> None:
+    expires = time.monotonic() + settings.SERIAL_CACHE_LOCAL_TTL
+    for serial in serials:
+        local_serials[serial] = expires
+
+
+def warm_serial_cache() -> None:
+    """
+    Load every produced serial into the process and the shared cache.
+
+    Called once per process on the first lookup.
+    """
+
+    global warmed
+    with warm_lock:
+        if warmed:
+            return
+        serials = list(RobotStock.objects.values_list("serial", flat=True))
+        cache.set_many({cache_key(serial): True for serial in serials}, timeout=None)
+        remember_serials(serials)
+        warmed = True
+
+
+def is_known_serial(serial) -> bool:
+    """
+    Tell whether robots of a serial have ever been produced.
+
+    The answer comes from the process's own copy when possible, then from
+    the shared Django cache, and only then from the database. It is only a
+    shortcut: stock is still reserved with a conditional UPDATE, so a stale
+    answer never lets an order take a robot that is not there.
+
+    Unknown serials are only cached when ``SERIAL_CACHE_NEGATIVE_TTL`` is set,
+    which needs a cache shared by every process: a process that never saw a
+    serial being produced would otherwise keep waitlisting orders for robots
+    in stock, and those customers are never notified.
+
+    Args:
+        serial (str): The serial of the robot.
+
+    Returns:
+        bool: True if the serial is known.
+    """
+
+    if not warmed:
+        warm_serial_cache()
+
+    if local_serials.get(serial, 0) > time.monotonic():
+        lookups.inc(result="local")
+        return True
+
+    known = cache.get(cache_key(serial))
+    if known is not None:
+        lookups.inc(result="shared")
+        if known:
+            remember_serials([serial])
+        return known
+
+    lookups.inc(result="database")
+    known = RobotStock.objects.filter(serial=serial).exists()
+    if known:
+        cache.set(cache_key(serial), True, timeout=None)
+        remember_serials([serial])
+    elif settings.SERIAL_CACHE_NEGATIVE_TTL:
+        # add() never overwrites a serial that was just produced
+        cache.add(cache_key(serial), False, timeout=settings.SERIAL_CACHE_NEGATIVE_TTL)
+    return known
+
+
+def add_known_serials(serials) -> None:
+    """
+    Record newly produced serials in the process and the shared cache.
+
+    Args:
+        serials (Iterable[str]): The serials of the created robots.
+    """
+
+    serials = set(serials)
+    cache.set_many({cache_key(serial): True for serial in serials}, timeout=None)
+    remember_serials(serials)
+
+
+def forget_serial(serial) -> None:
+    """
+    Drop a serial that no longer has any robots from the caches.
+
+    Other processes keep their own copy for up to ``SERIAL_CACHE_LOCAL_TTL``
+    seconds, which only costs them a reservation attempt that finds no stock.
+
+    Args:
+        serial (str): The serial of the deleted robots.
+    """
+
+    cache.delete(cache_key(serial))
+    local_serials.pop(serial, None)
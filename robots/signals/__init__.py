@@ -1,3 +1,21 @@
-from django.dispatch import Signal
+from helpers.metrics import TimedSignal
 
-robot_created = Signal()
\ No newline at end of file
+robot_created = TimedSignal()
+
+
+def get_created_robots(kwargs) -> list:
+    """
+    Return the robots carried by a ``robot_created`` signal.
+
+    Single-robot senders pass ``robot``, batch senders pass ``robots``.
+
+    Args:
+        kwargs (dict): Keyword arguments passed along with the signal.
+
+    Returns:
+        list: The created robots.
+    """
+
+    if "robots" in kwargs:
+        return list(kwargs["robots"])
+    return [kwargs["robot"]]
@@ -0,0 +1,84 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from robots.availability import availability_events, publish_availability
+from robots.models import Robot, RobotStock
+from robots.reports import invalidate_report_cache
+from robots.rollups import production_day, record_production
+from robots.serials import add_known_serials, forget_serial
+from robots.stock import add_to_stock
+from robots.signals import get_created_robots, robot_created
+
+
+@receiver(robot_created)
+def on_robot_created(sender, **kwargs):
+    """
+    Signal handler that keeps the daily production rollup and the stock up to date.
+
+    Args:
+        sender: The sender of the signal.
+        kwargs (dict): Keyword arguments passed along with the signal.
+
+    The signal is sent inside the transaction that inserts the robots, so the
+    rollup and the stock never disagree with the robots table.
+    """
+
+    robots = get_created_robots(kwargs)
+    record_production(robots)
+    add_to_stock(robots)
+
+    # Known before the commit, so no order can see the serial as unknown after it
+    add_known_serials(robot.serial for robot in robots)
+
+
+@receiver(robot_created)
+def invalidate_production_reports(sender, **kwargs):
+    """
+    Signal handler that drops cached reports covering the days robots were created on.
+
+    Args:
+        sender: The sender of the signal.
+        kwargs (dict): Keyword arguments passed along with the signal.
+
+    The cache is invalidated once the transaction commits, so a concurrent
+    request cannot cache a report built from the rollup before the update.
+    """
+
+    days = {production_day(robot.created) for robot in get_created_robots(kwargs)}
+    transaction.on_commit(partial(invalidate_report_cache, days))
+
+
+@receiver(robot_created)
+def push_robot_availability(sender, **kwargs):
+    """
+    Signal handler that pushes the new robots to the availability streams.
+
+    Args:
+        sender: The sender of the signal.
+        kwargs (dict): Keyword arguments passed along with the signal.
+
+    Subscribers are only told once the transaction commits, so they never
+    hear about robots that are rolled back.
+    """
+
+    events = availability_events(get_created_robots(kwargs))
+    transaction.on_commit(partial(publish_availability, events))
+
+
+@receiver(post_delete, sender=Robot)
+def on_robot_deleted(sender, instance, **kwargs):
+    """
+    Signal handler that forgets a serial once its last robot is deleted.
+
+    Args:
+        sender: The sender of the signal.
+        instance (Robot): The deleted robot.
+        kwargs (dict): Keyword arguments passed along with the signal.
+    """
+
+    if not Robot.objects.filter(serial=instance.serial).exists():
+        RobotStock.objects.filter(serial=instance.serial).delete()
+        transaction.on_commit(partial(forget_serial, instance.serial))
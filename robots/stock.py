@@ -0,0 +1,54 @@
+from collections import Counter
+
+from django.db.models import F
+
+from helpers.helpers import increment_or_create_many
+from .models import RobotStock
+
+
+def add_to_stock(robots) -> None:
+    """
+    Make newly created robots available for orders.
+
+    Args:
+        robots (Iterable[Robot]): The created robots.
+    """
+
+    return_to_stock(Counter(robot.serial for robot in robots))
+
+
+def return_to_stock(counts) -> None:
+    """
+    Make robots available for orders again, with a single upsert.
+
+    Args:
+        counts (Mapping[str, int]): The number of robots per serial.
+    """
+
+    increment_or_create_many(
+        RobotStock,
+        ["serial"],
+        "available",
+        {(serial,): count for serial, count in counts.items()},
+    )
+
+
+def reserve_robot(serial) -> bool:
+    """
+    Take one robot of a serial out of stock.
+
+    The reservation is a single conditional ``UPDATE``, so concurrent orders
+    can never take more robots than there are.
+
+    Args:
+        serial (str): The serial of the robot.
+
+    Returns:
+        bool: True if a robot was reserved, False if none is in stock.
+    """
+
+    return bool(
+        RobotStock.objects.filter(serial=serial, available__gt=0).update(
+            available=F("available") - 1
+        )
+    )
@@ -1,3 +1,716 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from helpers.exports import filter_export, iter_rows
+from helpers.models import IdempotencyKey
+from orders.models import SerialDemand
+from .availability import AvailabilityBroker, broker, subscription_keys
+from .jobs import (
+    enqueue_weekly_report,
+    get_latest_weekly_report,
+    prune_report_jobs,
+    run_next_report_job,
+    snapshot_path,
+)
+from .models import DailyProduction, ReportJob, Robot, RobotStock
+from .partitions import (
+    archive_partitions,
+    create_partition,
+    ensure_partitions,
+    list_partitions,
+    partition_name,
+)
+from .reports import DEMAND_HEADERS, DEMAND_SHEET_TITLE, REPORT_HEADERS, XLSX_CONTENT_TYPE
+from .rollups import rebuild_daily_production, record_production, robots_produced
+from .signals import robot_created
 
 # Create your tests here.
+
+MONTHS = [date(2023, 1, 1), date(2023, 2, 1), date(2023, 3, 1)]
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+class RobotPartitionTests(TestCase):
+    def setUp(self):
+        for month in MONTHS:
+            create_partition(month)
+        Robot.objects.bulk_create(
+            Robot(
+                serial="R2-D2",
+                model="R2",
+                version="D2",
+                created=timezone.make_aware(datetime(month.year, month.month, 15)),
+            )
+            for month in MONTHS
+        )
+
+    def assertScansOnly(self, queryset, month):
+        plan = queryset.explain()
+        self.assertIn(partition_name(month), plan)
+        for other in MONTHS:
+            if other != month:
+                self.assertNotIn(partition_name(other), plan)
+        self.assertNotIn("robots_robot_default", plan)
+
+    def test_export_range_is_pruned(self):
+        robots = filter_export(
+            Robot.objects.all(),
+            "model",
+            timezone.make_aware(datetime(2023, 2, 1)),
+            timezone.make_aware(datetime(2023, 3, 1)),
+        )
+        self.assertScansOnly(robots, MONTHS[1])
+
+    def test_rollup_rebuild_range_is_pruned(self):
+        robots = robots_produced(date(2023, 2, 10), date(2023, 2, 20))
+        self.assertScansOnly(robots.values_list("model", "version"), MONTHS[1])
+
+    def test_creates_partitions_ahead(self):
+        created = ensure_partitions(2, today=date(2030, 11, 5))
+
+        self.assertEqual(
+            created,
+            ["robots_robot_p2030_11", "robots_robot_p2030_12", "robots_robot_p2031_01"],
+        )
+        self.assertEqual(ensure_partitions(2, today=date(2030, 11, 5)), [])
+
+    def test_archives_old_partitions(self):
+        archived = archive_partitions(date(2023, 2, 1))
+
+        self.assertEqual(archived, [partition_name(MONTHS[0])])
+        self.assertNotIn(partition_name(MONTHS[0]), list_partitions())
+        self.assertEqual(Robot.objects.count(), 2)
+
+
+class ExportRowsTests(TestCase):
+    def setUp(self):
+        Robot.objects.bulk_create(
+            Robot(serial="R2-D2", model="R2", version="D2", created=timezone.now())
+            for _ in range(7)
+        )
+
+    def test_pages_by_key(self):
+        robots = Robot.objects.order_by("id")
+        expected = list(robots.values_list("id", "serial"))
+
+        # Two full pages of 3 and a short one
+        with self.assertNumQueries(3):
+            rows = list(iter_rows(robots, ["id", "serial"], 3))
+
+        self.assertEqual(rows, expected)
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportRobotsTests(TestCase):
+    def setUp(self):
+        Robot.objects.bulk_create(
+            Robot(
+                serial=f"{model}-{version}",
+                model=model,
+                version=version,
+                created=timezone.make_aware(created),
+            )
+            for model, version, created in [
+                ("R2", "D2", datetime(2023, 1, 1, 12)),
+                ("C3", "PO", datetime(2023, 1, 2, 12)),
+                ("R2", "A1", datetime(2023, 1, 3, 12)),
+                ("X5", "LT", datetime(2023, 1, 4, 12)),
+                ("R2", "D2", datetime(2023, 1, 5, 12)),
+            ]
+        )
+
+    def export(self, query=""):
+        response = self.client.get(f"/api/robots/export/{query}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def serials(self, query=""):
+        return [json.loads(line)["serial"] for line in self.export(query).splitlines()]
+
+    def test_exports_every_robot_as_ndjson(self):
+        lines = self.export().splitlines()
+
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(
+            json.loads(lines[0]),
+            {
+                "id": Robot.objects.order_by("id").first().id,
+                "serial": "R2-D2",
+                "model": "R2",
+                "version": "D2",
+                "created": "2023-01-01T12:00:00Z",
+            },
+        )
+
+    def test_exports_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export("?format=csv"))))
+
+        self.assertEqual(rows[0], ["id", "serial", "model", "version", "created"])
+        self.assertEqual(
+            [row[1] for row in rows[1:]], ["R2-D2", "C3-PO", "R2-A1", "X5-LT", "R2-D2"]
+        )
+
+    def test_filters_on_the_created_range(self):
+        self.assertEqual(self.serials("?start=2023-01-02&end=2023-01-04"), ["C3-PO", "R2-A1"])
+        self.assertEqual(self.serials("?start=2023-01-04T12:00:00"), ["X5-LT", "R2-D2"])
+        self.assertEqual(self.serials("?end=2023-01-01T12:00:00"), [])
+
+    def test_filters_on_models(self):
+        self.assertEqual(self.serials("?model=R2"), ["R2-D2", "R2-A1", "R2-D2"])
+        self.assertEqual(self.serials("?model=C3&model=X5"), ["C3-PO", "X5-LT"])
+        self.assertEqual(self.serials("?model=R2&start=2023-01-02"), ["R2-A1", "R2-D2"])
+
+    def test_rejects_invalid_queries(self):
+        self.assertEqual(self.client.get("/api/robots/export/?format=xml").status_code, 400)
+        self.assertEqual(self.client.get("/api/robots/export/?start=yesterday").status_code, 400)
+        self.assertEqual(self.client.post("/api/robots/export/").status_code, 400)
+
+
+@override_settings(REPORT_SNAPSHOT_DIR=tempfile.mkdtemp(), REPORT_JOB_LEASE=60)
+class ReportJobTests(TestCase):
+    def test_running_jobs_are_skipped_until_the_lease_expires(self):
+        job = enqueue_weekly_report()
+        ReportJob.objects.filter(id=job.id).update(
+            status=ReportJob.Status.RUNNING, started_at=timezone.now()
+        )
+        self.assertIsNone(run_next_report_job())
+
+        ReportJob.objects.filter(id=job.id).update(
+            started_at=timezone.now() - timedelta(seconds=61)
+        )
+        self.assertEqual(run_next_report_job().id, job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.Status.DONE)
+
+    def test_finished_jobs_are_pruned_with_their_files(self):
+        old, recent = enqueue_weekly_report(date(2023, 1, 1)), enqueue_weekly_report()
+        run_next_report_job()
+        run_next_report_job()
+        old.refresh_from_db()
+        ReportJob.objects.filter(id=old.id).update(
+            finished_at=timezone.now() - timedelta(days=8)
+        )
+
+        self.assertTrue(os.path.exists(snapshot_path(old.file)))
+        with self.settings(REPORT_JOB_RETENTION=7 * 24 * 60 * 60):
+            self.assertEqual(prune_report_jobs(), 1)
+
+        self.assertEqual(list(ReportJob.objects.values_list("id", flat=True)), [recent.id])
+        self.assertFalse(os.path.exists(snapshot_path(old.file)))
+
+    def test_post_report_job(self):
+        url = "/api/reports/jobs/"
+        response = self.client.post(
+            url,
+            {"start": "2023-01-01", "end": "2023-01-07", "models": ["R2"], "format": "csv"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 202)
+        job = ReportJob.objects.get(id=response.json()["id"])
+        self.assertEqual((job.robot_models, job.format), (["R2"], "csv"))
+
+        for body in ([], '"2023-01-01"', {"start": "2023-01-01"}, {"start": "x", "end": "y"}):
+            response = self.client.post(url, body, content_type="application/json")
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(
+            self.client.post(url, [], content_type="application/json").json(),
+            {"message": "Item must be a JSON object."},
+        )
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    def test_only_the_weekly_report_ending_today_is_served(self):
+        today = timezone.localdate()
+        enqueue_weekly_report(today - timedelta(days=1))
+        run_next_report_job()
+        self.assertIsNone(get_latest_weekly_report())
+
+        job = enqueue_weekly_report()
+        run_next_report_job()
+        self.assertEqual(get_latest_weekly_report().id, job.id)
+
+
+@override_settings(REPORT_SNAPSHOT_DIR=tempfile.mkdtemp())
+class WeeklyReportTests(TestCase):
+    url = "/download_weekly_report/"
+
+    def setUp(self):
+        today = timezone.localdate()
+        DailyProduction.objects.bulk_create(
+            DailyProduction(
+                day=today - timedelta(days=days), model=model, version=version, count=count
+            )
+            for days, model, version, count in [
+                (0, "R2", "D2", 2),
+                (6, "R2", "D2", 3),
+                (1, "R2", "A1", 1),
+                (3, "X5", "LT", 4),
+                # Before the week
+                (7, "R2", "D2", 10),
+                (7, "C3", "PO", 10),
+            ]
+        )
+
+    def workbook(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        return {ws.title: list(ws.iter_rows(values_only=True)) for ws in workbook.worksheets}
+
+    def assertWeek(self, sheets):
+        self.assertEqual(sheets["R2"], [REPORT_HEADERS, ("R2", "A1", 1), ("R2", "D2", 5)])
+        self.assertEqual(sheets["X5"], [REPORT_HEADERS, ("X5", "LT", 4)])
+
+    def test_rendered_on_the_spot_with_one_sheet_per_model(self):
+        sheets = self.workbook(self.client.get(self.url))
+
+        self.assertEqual(list(sheets), ["R2", "X5"])
+        self.assertWeek(sheets)
+
+    def test_demand_sheet(self):
+        SerialDemand.objects.create(serial="C3-PO", model="C3", version="PO", waiting=2)
+
+        sheets = self.workbook(self.client.get(self.url, {"demand": "1"}))
+
+        self.assertEqual(list(sheets), ["R2", "X5", DEMAND_SHEET_TITLE])
+        self.assertWeek(sheets)
+        self.assertEqual(
+            sheets[DEMAND_SHEET_TITLE], [DEMAND_HEADERS, ("C3-PO", "C3", "PO", 2, None)]
+        )
+
+    def test_serves_the_rendered_report(self):
+        enqueue_weekly_report()
+        run_next_report_job()
+        DailyProduction.objects.all().delete()
+
+        sheets = self.workbook(self.client.get(self.url))
+
+        self.assertEqual(list(sheets), ["R2", "X5"])
+        self.assertWeek(sheets)
+
+
+class PostRobotBatchTests(TestCase):
+    url = "/api/robots/"
+
+    def post(self, body, content_type="application/json"):
+        return self.client.post(self.url, body, content_type=content_type)
+
+    def test_creates_a_json_array_of_robots(self):
+        response = self.post(
+            json.dumps(
+                [
+                    {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"},
+                    {"model": "R2", "version": "D2", "created": "2023-01-01 12:00:00"},
+                    {"model": "X5", "version": "LT", "created": "2023-01-02 00:00:00"},
+                ]
+            )
+        )
+
+        self.assertEqual(response.status_code, 201)
+        ids = Robot.objects.order_by("id").values_list("id", flat=True)
+        self.assertEqual(response.json()["ids"], list(ids))
+        self.assertEqual(
+            dict(RobotStock.objects.values_list("serial", "available")),
+            {"R2-D2": 2, "X5-LT": 1},
+        )
+        self.assertEqual(
+            set(DailyProduction.objects.values_list("day", "model", "version", "count")),
+            {(date(2023, 1, 1), "R2", "D2", 2), (date(2023, 1, 2), "X5", "LT", 1)},
+        )
+
+    def test_creates_ndjson_robots(self):
+        body = (
+            '{"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"}\n'
+            "\n"
+            '{"model": "C3", "version": "PO", "created": "2023-01-01 00:00:00"}\n'
+        )
+
+        response = self.post(body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, 201)
+        serials = Robot.objects.order_by("id").values_list("serial", flat=True)
+        self.assertEqual(list(serials), ["R2-D2", "C3-PO"])
+
+    def test_invalid_ndjson_line_rejects_the_batch(self):
+        body = (
+            '{"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"}\n'
+            '{"model": \n'
+        )
+
+        response = self.post(body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Robot.objects.exists())
+
+    def test_invalid_items_are_reported_by_index(self):
+        response = self.post(
+            json.dumps(
+                [
+                    {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"},
+                    {"model": "R2", "created": "2023-01-01 00:00:00"},
+                    {"model": "R2", "version": "D2", "created": "yesterday"},
+                ]
+            )
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(set(response.json()["errors"]), {"1", "2"})
+        self.assertEqual(Robot.objects.count(), 1)
+
+    def test_batch_without_valid_items_is_rejected(self):
+        response = self.post(json.dumps([{"model": "R2"}, "R2-D2"]))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["errors"]), {"0", "1"})
+        self.assertFalse(Robot.objects.exists())
+
+    @override_settings(ROBOT_BATCH_MAX_ITEMS=2)
+    def test_empty_and_oversized_batches_are_rejected(self):
+        robot = {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"}
+
+        self.assertEqual(self.post("[]").status_code, 400)
+        self.assertEqual(self.post(json.dumps([robot] * 3)).status_code, 400)
+        self.assertFalse(Robot.objects.exists())
+
+    def test_failing_signal_handler_rolls_the_batch_back(self):
+        robots = [
+            {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"},
+            {"model": "X5", "version": "LT", "created": "2023-01-01 00:00:00"},
+        ]
+
+        with mock.patch("robots.signals.handlers.add_to_stock", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post(json.dumps(robots))
+
+        self.assertFalse(Robot.objects.exists())
+        self.assertFalse(DailyProduction.objects.exists())
+
+    def test_query_count_does_not_depend_on_the_batch(self):
+        robots = [
+            {"model": model, "version": version, "created": f"2023-01-0{day} 00:00:00"}
+            for model in ["R2", "C3", "X5", "T1"]
+            for version in ["D2", "PO", "LT", "A1", "B8"]
+            for day in range(1, 8)
+        ]
+
+        # Insert the robots, check the waitlist, upsert the rollup and the stock,
+        # in a transaction
+        with self.assertNumQueries(6):
+            response = self.post(json.dumps(robots))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(RobotStock.objects.count(), 20)
+
+
+class PostRobotIdempotencyTests(TestCase):
+    body = {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"}
+
+    def setUp(self):
+        self.sent = []
+        robot_created.connect(self.on_robot_created)
+        self.addCleanup(robot_created.disconnect, self.on_robot_created)
+
+    def on_robot_created(self, sender, **kwargs):
+        self.sent.append(kwargs)
+
+    def post_robot(self, key):
+        return self.client.post(
+            "/api/robots/",
+            self.body,
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_is_replayed_without_sending_robot_created_again(self):
+        first = self.post_robot("retry")
+
+        retry = self.post_robot("retry")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Robot.objects.count(), 1)
+        self.assertEqual(len(self.sent), 1)
+
+    def test_key_in_progress_is_rejected(self):
+        IdempotencyKey.objects.create(
+            path="/api/robots/",
+            key="retry",
+            fingerprint="",
+            expires_at=timezone.now() + timedelta(seconds=30),
+        )
+
+        response = self.post_robot("retry")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Robot.objects.exists())
+        self.assertEqual(self.sent, [])
+
+
+R2_D2_PRODUCED = {"serial": "R2-D2", "model": "R2", "version": "D2", "produced": 1}
+
+
+async def subscribe(keys):
+    return broker.subscribe(keys)
+
+
+class AvailabilityBrokerTests(SimpleTestCase):
+    async def test_events_reach_the_subscribers_of_their_serial_or_model(self):
+        availability = AvailabilityBroker()
+        by_serial = availability.subscribe(subscription_keys(serials=["R2-D2"]))
+        by_model = availability.subscribe(subscription_keys(models=["R2"]))
+        other = availability.subscribe(subscription_keys(serials=["C3-PO"]))
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, availability.publish, [R2_D2_PRODUCED])
+
+        self.assertEqual(await asyncio.wait_for(by_serial.queue.get(), 1), R2_D2_PRODUCED)
+        self.assertEqual(await asyncio.wait_for(by_model.queue.get(), 1), R2_D2_PRODUCED)
+        self.assertTrue(other.queue.empty())
+
+        for subscription in (by_serial, by_model, other):
+            availability.unsubscribe(subscription)
+        self.assertEqual(availability.subscriptions, {})
+
+    def test_views_reject_invalid_requests(self):
+        poll = "/api/robots/availability/poll/"
+        self.assertEqual(self.client.post(poll, {"serial": "R2-D2"}).status_code, 400)
+        self.assertEqual(self.client.get(poll).status_code, 400)
+        response = self.client.get(poll, {"serial": "R2-D2", "timeout": "soon"})
+        self.assertEqual(response.status_code, 400)
+
+        # The test client is not an ASGI server
+        response = self.client.get("/api/robots/availability/stream/", {"serial": "R2-D2"})
+        self.assertEqual(response.status_code, 400)
+
+
+class PushRobotAvailabilityTests(TestCase):
+    def test_robots_are_published_once_committed(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = loop.run_until_complete(
+            subscribe(subscription_keys(serials=["R2-D2"]))
+        )
+        self.addCleanup(broker.unsubscribe, subscription)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(
+                "/api/robots/",
+                {"model": "R2", "version": "D2", "created": "2023-01-01 00:00:00"},
+                content_type="application/json",
+            )
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertTrue(subscription.queue.empty())
+
+        for callback in callbacks:
+            callback()
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(subscription.queue.get_nowait(), R2_D2_PRODUCED)
+
+
+class PollAvailabilityTests(TransactionTestCase):
+    url = "/api/robots/availability/poll/"
+
+    async def test_no_content_once_the_timeout_passes(self):
+        response = await self.async_client.get(self.url, {"serial": "R2-D2", "timeout": "0"})
+
+        self.assertEqual(response.status_code, 204)
+
+    async def test_serials_in_stock_are_returned_right_away(self):
+        await RobotStock.objects.acreate(serial="R2-D2", available=2)
+        await RobotStock.objects.acreate(serial="R2-C3", available=0)
+
+        response = await self.async_client.get(self.url, {"model": "R2", "timeout": "5"})
+
+        self.assertEqual(
+            response.json(),
+            {
+                "events": [
+                    {"serial": "R2-D2", "model": "R2", "version": "D2", "available": 2}
+                ]
+            },
+        )
+
+    async def test_robots_produced_while_waiting_are_returned(self):
+        poll = asyncio.create_task(
+            self.async_client.get(self.url, {"serial": "R2-D2", "timeout": "5"})
+        )
+        while "serial:R2-D2" not in broker.subscriptions and not poll.done():
+            await asyncio.sleep(0.01)
+
+        broker.publish([R2_D2_PRODUCED])
+
+        response = await poll
+        self.assertEqual(response.json(), {"events": [R2_D2_PRODUCED]})
+
+
+class DailyProductionTests(TestCase):
+    def robot(self, serial, created):
+        model, version = serial.split("-")
+        return Robot(
+            serial=serial, model=model, version=version, created=timezone.make_aware(created)
+        )
+
+    def rollup(self):
+        return set(DailyProduction.objects.values_list("day", "model", "version", "count"))
+
+    def test_record_production_counts_robots_per_day_model_and_version(self):
+        record_production(
+            [
+                self.robot("R2-D2", datetime(2023, 1, 1, 8)),
+                self.robot("R2-D2", datetime(2023, 1, 1, 20)),
+                self.robot("R2-A1", datetime(2023, 1, 1, 9)),
+                self.robot("R2-D2", datetime(2023, 1, 2, 9)),
+            ]
+        )
+        record_production([self.robot("R2-D2", datetime(2023, 1, 1, 23, 59))])
+
+        self.assertEqual(
+            self.rollup(),
+            {
+                (date(2023, 1, 1), "R2", "D2", 3),
+                (date(2023, 1, 1), "R2", "A1", 1),
+                (date(2023, 1, 2), "R2", "D2", 1),
+            },
+        )
+
+    def test_rebuild_recounts_the_robots(self):
+        Robot.objects.bulk_create(
+            [
+                self.robot("R2-D2", datetime(2023, 1, 1, 8)),
+                self.robot("R2-D2", datetime(2023, 1, 1, 20)),
+                self.robot("X5-LT", datetime(2023, 1, 2, 9)),
+            ]
+        )
+        DailyProduction.objects.create(day=date(2023, 1, 1), model="R2", version="D2", count=7)
+
+        self.assertEqual(rebuild_daily_production(), 2)
+        self.assertEqual(
+            self.rollup(),
+            {(date(2023, 1, 1), "R2", "D2", 2), (date(2023, 1, 2), "X5", "LT", 1)},
+        )
+
+    def test_rebuilding_a_range_keeps_the_other_days(self):
+        Robot.objects.bulk_create(
+            [
+                self.robot("R2-D2", datetime(2023, 1, 1, 8)),
+                self.robot("R2-D2", datetime(2023, 1, 2, 8)),
+            ]
+        )
+        DailyProduction.objects.create(day=date(2023, 1, 1), model="R2", version="D2", count=7)
+
+        rebuild_daily_production(date(2023, 1, 2), date(2023, 1, 2))
+
+        self.assertEqual(
+            self.rollup(),
+            {(date(2023, 1, 1), "R2", "D2", 7), (date(2023, 1, 2), "R2", "D2", 1)},
+        )
+
+    def test_migration_backfills_the_robots_produced_before_it(self):
+        migration = import_module("robots.migrations.0003_dailyproduction")
+        Robot.objects.bulk_create(
+            [
+                self.robot("R2-D2", datetime(2023, 1, 1, 8)),
+                self.robot("R2-D2", datetime(2023, 1, 1, 20)),
+            ]
+        )
+
+        migration.backfill_daily_production(apps, None)
+
+        self.assertEqual(self.rollup(), {(date(2023, 1, 1), "R2", "D2", 2)})
+
+
+class ProductionReportTests(TestCase):
+    url = "/api/reports/production/"
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate().isoformat()
+
+    def post_robot(self, model, version):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/robots/",
+                {"model": model, "version": version, "created": f"{self.today} 00:00:00"},
+                content_type="application/json",
+            )
+
+    def get_report(self, **params):
+        params = {"start": self.today, "end": self.today, "format": "json", **params}
+        return self.client.get(self.url, params).json()
+
+    def test_reports_are_cached_until_robots_are_created(self):
+        self.post_robot("R2", "D2")
+        self.assertEqual(
+            self.get_report(), [{"model": "R2", "version": "D2", "count": 1}]
+        )
+
+        with self.assertNumQueries(0):
+            self.get_report()
+
+        self.post_robot("R2", "D2")
+        self.assertEqual(
+            self.get_report(), [{"model": "R2", "version": "D2", "count": 2}]
+        )
+
+    def test_model_filters_do_not_share_cache_entries(self):
+        self.post_robot("R2", "D2")
+        self.post_robot("X5", "LT")
+
+        # A single model named "R2,X5", which does not exist
+        self.assertEqual(self.get_report(model="R2,X5"), [])
+        self.assertEqual(
+            self.get_report(model=["R2", "X5"]),
+            [
+                {"model": "R2", "version": "D2", "count": 1},
+                {"model": "X5", "version": "LT", "count": 1},
+            ],
+        )
+
+
+class RobotAdminTests(TestCase):
+    def setUp(self):
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(User.objects.get())
+        self.robot = Robot.objects.create(
+            serial="R2-D2", model="R2", version="D2", created=timezone.now()
+        )
+
+    def test_robots_are_read_only(self):
+        form = {
+            "serial": "R2-D3",
+            "model": "R2",
+            "version": "D3",
+            "created_0": "2023-01-01",
+            "created_1": "00:00:00",
+        }
+
+        add = self.client.post("/admin/robots/robot/add/", form)
+        change = self.client.post(f"/admin/robots/robot/{self.robot.id}/change/", form)
+        delete = self.client.post(f"/admin/robots/robot/{self.robot.id}/delete/", {"post": "yes"})
+
+        self.assertEqual(add.status_code, 403)
+        self.assertEqual(change.status_code, 403)
+        self.assertEqual(delete.status_code, 403)
+        self.assertEqual(list(Robot.objects.values_list("serial", flat=True)), ["R2-D2"])
+
+    def test_robots_can_still_be_viewed(self):
+        changelist = self.client.get("/admin/robots/robot/")
+        change = self.client.get(f"/admin/robots/robot/{self.robot.id}/change/")
+
+        self.assertEqual(changelist.status_code, 200)
+        self.assertEqual(change.status_code, 200)
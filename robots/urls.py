@@ -3,5 +3,14 @@ from . import views
 
 urlpatterns = [
     path("api/robots/", views.post_robot),
+    path("api/async/robots/", views.apost_robot),
+    path("api/robots/export/", views.export_robots),
+    path("api/robots/list/", views.list_robots),
+    path("api/robots/availability/stream/", views.stream_availability),
+    path("api/robots/availability/poll/", views.poll_availability),
     path("download_weekly_report/", views.generate_weekly_report),
+    path("api/reports/production/", views.get_production_report),
+    path("api/reports/jobs/", views.post_report_job),
+    path("api/reports/jobs/<int:job_id>/", views.get_report_job),
+    path("api/reports/jobs/<int:job_id>/download/", views.download_report_job),
 ]
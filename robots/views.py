@@ -1,43 +1,184 @@
-from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Count
-from openpyxl import Workbook
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+import asyncio
 import json
 
-from helpers.helpers import validate_json_data
+from helpers.executors import run_blocking
+from helpers.exports import export_response, parse_moment
+from helpers.pagination import keyset_page
+from helpers.middleware import latency_budget
+from helpers.helpers import async_csrf_exempt, load_json_body, validate_json_data
+from helpers.idempotency import idempotent
+from helpers.serialization import loads
+from orders.demand import get_demand
 from .signals import robot_created
-from .forms import RobotForm
-from .models import Robot
+from .forms import ROBOT_SCHEMA
+from .availability import broker, start_listener, stock_events, subscription_keys
+from .jobs import get_latest_weekly_report, snapshot_path
+from .models import ReportJob, Robot
+from .reports import (
+    REPORT_CONTENT_TYPES,
+    XLSX_CONTENT_TYPE,
+    get_cached_report,
+    get_production_summary,
+    render_report_file,
+)
 
 # Create your views here.
 
+ROBOT_EXPORT_FIELDS = ["id", "serial", "model", "version", "created"]
 
-def create_robot_instance(data) -> RobotForm:
+
+def create_robot_instance(data) -> Robot:
+    """
+    Create an unsaved Robot from validated data.
+
+    Args:
+        data (dict): The values returned by ``ROBOT_SCHEMA.validate``.
+
+    Returns:
+        Robot: The robot, with its serial derived from its model and version.
+    """
+
+    return Robot(
+        serial="{}-{}".format(data["model"], data["version"]),
+        model=data["model"],
+        version=data["version"],
+        created=data["created"],
+    )
+
+
+def validate_robot_batch(items) -> tuple:
     """
-    Create an instance of the RobotForm with the given data.
+    Validate every item of a robot batch with the same rules as a single robot.
 
     Args:
-        data (dict): A dictionary containing data for creating an order instance.
+        items (list): The parsed items of the batch.
 
     Returns:
-        RobotForm: An instance of the RobotForm.
+        tuple: A list of unsaved Robot instances for the valid items and a dict
+        mapping the index of every invalid item to its error payload.
+    """
+
+    robots = []
+    errors = {}
+    for index, item in enumerate(items):
+        data, error = ROBOT_SCHEMA.validate(item)
+        if error is None:
+            robots.append(create_robot_instance(data))
+        else:
+            errors[index] = error
+    return robots, errors
+
+
+def check_robot_batch_size(items):
     """
+    Check that a robot batch is neither empty nor too large.
 
-    robot_data = {
-        "serial": "{}-{}".format(data["model"], data["version"]),
-        "model": data["model"],
-        "version": data["version"],
-        "created": data["created"],
+    Args:
+        items (list): The parsed items of the batch.
+
+    Returns:
+        JsonResponse | None: An error response, or None if the size is acceptable.
+    """
+
+    if not items:
+        response = {"message": "Batch must contain at least one robot."}
+        return JsonResponse(response, status=400)
+
+    if len(items) > settings.ROBOT_BATCH_MAX_ITEMS:
+        response = {
+            "message": f"Batch must not contain more than {settings.ROBOT_BATCH_MAX_ITEMS} robots."
+        }
+        return JsonResponse(response, status=400)
+    return None
+
+
+def save_robots(robots) -> list:
+    """
+    Insert robots with a single bulk insert and announce them with ``robot_created``.
+
+    Args:
+        robots (list[Robot]): Unsaved, validated Robot instances.
+
+    Returns:
+        list[Robot]: The saved robots.
+    """
+
+    with transaction.atomic():
+        robots = Robot.objects.bulk_create(
+            robots, batch_size=settings.ROBOT_BULK_CREATE_BATCH_SIZE
+        )
+        robot_created.send(Robot, robots=robots)
+    return robots
+
+
+def robot_batch_response(robots, errors) -> JsonResponse:
+    """
+    Build the response to a robot batch.
+
+    Args:
+        robots (list[Robot]): The saved robots.
+        errors (dict): The error payloads of the invalid items, by index.
+
+    Returns:
+        JsonResponse: 201 if every item was saved, 207 if some were invalid.
+    """
+
+    response = {
+        "message": f"{len(robots)} new robot(s) added",
+        "ids": [robot.id for robot in robots],
+        "errors": errors,
     }
-    return RobotForm(robot_data)
+    return JsonResponse(response, status=207 if errors else 201)
+
+
+def post_robot_batch(items) -> JsonResponse:
+    """
+    Create robots from a batch of items with a single bulk insert.
+
+    Valid items are inserted in one transaction and announced with a single
+    ``robot_created`` signal; invalid items are reported by their index.
+
+    Args:
+        items (list): The parsed items of the batch.
+
+    Returns:
+        JsonResponse: A JSON response containing the result of the operation.
+    """
+
+    response = check_robot_batch_size(items)
+    if response is not None:
+        return response
+
+    robots, errors = validate_robot_batch(items)
+    if not robots:
+        response = {"message": "Validation error", "errors": errors}
+        return JsonResponse(response, status=400)
+
+    return robot_batch_response(save_robots(robots), errors)
 
 
 @method_decorator(csrf_exempt, name="dispatch")
+@idempotent
 def post_robot(request) -> JsonResponse:
     """
-    View function for creating a new order via HTTP POST request.
+    View function for creating new robots via HTTP POST request.
+
+    The body is either a single JSON object, or a batch sent as a JSON array
+    or as NDJSON (``Content-Type: application/x-ndjson``).
+
+    Retries sent with the same ``Idempotency-Key`` header get the first
+    response back without running the view again; see
+    ``helpers.idempotency.idempotent``.
 
     Args:
         request (HttpRequest): The HTTP request object.
@@ -47,29 +188,21 @@ def post_robot(request) -> JsonResponse:
     """
     if request.method == "POST":
         try:
-            data = json.loads(request.body.decode("utf-8"))
+            data = load_json_body(request)
+            if isinstance(data, list):
+                return post_robot_batch(data)
 
-            required_fields = {"model", "version", "created"}
-            missing_fields = validate_json_data(data, required_fields)
-
-            if missing_fields:
-                missing_fields_list = ", ".join(missing_fields)
-                response = {
-                    "message": f"Missing required field(s) in JSON data: {missing_fields_list}"
-                }
-                return JsonResponse(response, status=400)
-
-            form = create_robot_instance(data)
-            if form.is_valid():
-                robot = form.save()
+            data, error = ROBOT_SCHEMA.validate(data)
+            if error is not None:
+                return JsonResponse(error, status=400)
 
+            robot = create_robot_instance(data)
+            with transaction.atomic():
+                robot.save()
                 robot_created.send(Robot, robot=robot)
-                response = {"message": f"New robot added with id: {robot.id}"}
-                return JsonResponse(response, status=201)
-            else:
-                errors = form.errors
-                response = {"message": "Validation error", "errors": errors}
-                return JsonResponse(response, status=400)
+
+            response = {"message": f"New robot added with id: {robot.id}"}
+            return JsonResponse(response, status=201)
 
         except json.JSONDecodeError:
             response = {"message": "Invalid JSON format in the request body."}
@@ -79,73 +212,498 @@ def post_robot(request) -> JsonResponse:
         return JsonResponse(response, status=400)
 
 
+@async_csrf_exempt
+@idempotent
+async def apost_robot(request) -> JsonResponse:
+    """
+    Async counterpart of ``post_robot`` for ASGI servers.
+
+    Parsing and validation run on the event loop; the insert transaction,
+    which also runs the ``robot_created`` handlers, runs in the bounded
+    blocking executor.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: A JSON response containing the result of the operation.
+    """
+    if request.method != "POST":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    try:
+        data = load_json_body(request)
+    except json.JSONDecodeError:
+        response = {"message": "Invalid JSON format in the request body."}
+        return JsonResponse(response, status=400)
+
+    if isinstance(data, list):
+        response = check_robot_batch_size(data)
+        if response is not None:
+            return response
+
+        robots, errors = validate_robot_batch(data)
+        if not robots:
+            response = {"message": "Validation error", "errors": errors}
+            return JsonResponse(response, status=400)
+
+        robots = await run_blocking(save_robots, robots)
+        return robot_batch_response(robots, errors)
+
+    data, error = ROBOT_SCHEMA.validate(data)
+    if error is not None:
+        return JsonResponse(error, status=400)
+
+    [robot] = await run_blocking(save_robots, [create_robot_instance(data)])
+    response = {"message": f"New robot added with id: {robot.id}"}
+    return JsonResponse(response, status=201)
+
+
+def export_robots(request) -> HttpResponse:
+    """
+    View function for streaming robots as NDJSON or CSV.
+
+    See ``helpers.exports.export_response`` for the query parameters.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: A streaming response with the robots, ordered by id.
+    """
+
+    return export_response(
+        request,
+        Robot.objects.all(),
+        ROBOT_EXPORT_FIELDS,
+        "model",
+        "robots",
+    )
+
+
+def list_robots(request) -> HttpResponse:
+    """
+    View function for listing robots, one keyset-paginated page at a time.
+
+    Query parameters:
+        model (str, optional): Only robots of this model; may be repeated.
+        version (str, optional): Only robots of this version; may be repeated.
+        start (str, optional): Only robots created at or after this date or datetime.
+        end (str, optional): Only robots created before this date or datetime.
+        after, limit: See ``helpers.pagination.keyset_page``.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: A page of robots, ordered by id.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    robots = Robot.objects.all()
+    if request.GET.getlist("model"):
+        robots = robots.filter(model__in=request.GET.getlist("model"))
+    if request.GET.getlist("version"):
+        robots = robots.filter(version__in=request.GET.getlist("version"))
+    try:
+        if request.GET.get("start"):
+            robots = robots.filter(created__gte=parse_moment(request.GET["start"]))
+        if request.GET.get("end"):
+            robots = robots.filter(created__lt=parse_moment(request.GET["end"]))
+    except ValueError:
+        response = {"message": "Dates must be in ISO 8601 format."}
+        return JsonResponse(response, status=400)
+
+    return keyset_page(request, robots, ROBOT_EXPORT_FIELDS)
+
+
+def report_job_response(request, job) -> HttpResponse:
+    """
+    Serve the file of a rendered report job.
+
+    Rendered files never change, so the job id is a strong ETag and the time
+    it finished is its Last-Modified date; conditional requests that match
+    are answered with 304 Not Modified without touching the file.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        job (ReportJob): A job with status ``done``.
+
+    Returns:
+        HttpResponse: The file as an attachment, or a 304 response.
+
+    Raises:
+        FileNotFoundError: If the file was removed from ``REPORT_SNAPSHOT_DIR``.
+    """
+
+    etag = f'"report-{job.id}"'
+    last_modified = int(job.finished_at.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = FileResponse(
+            open(snapshot_path(job.file), "rb"),
+            as_attachment=True,
+            filename=f"report {job.start_date}_{job.end_date}.{job.format}",
+            content_type=REPORT_CONTENT_TYPES[job.format],
+        )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
 @method_decorator(csrf_exempt, name="dispatch")
-def generate_weekly_report(request):
+def generate_weekly_report(request) -> HttpResponse:
     """
-    View function for generating a weekly report in Excel format.
+    View function for downloading the weekly report in Excel format.
+
+    Query parameters:
+        demand (str, optional): ``1`` to add a sheet with the serials customers are
+            waiting for. The demand is current rather than weekly, so such reports
+            are always rendered on the spot.
 
     Args:
         request (HttpRequest): The HTTP request object.
 
     Returns:
-        HttpResponse: An HTTP response containing the generated Excel report.
+        HttpResponse: Today's pre-rendered weekly report, a 304 response if the
+        client already has it, or a report rendered on the spot if it does not
+        exist yet.
 
     This view function performs the following actions:
-    1. Creates a new Excel workbook using the `openpyxl` library.
-    2. Determines the current date as `end_date` and calculates `start_date` as 7 days before `end_date`.
-    3. Retrieves a list of unique robot models from the database.
-    4. Iterates over each unique model to create a separate worksheet for each model in the workbook.
-    5. Adds headers for "Модель" (Model), "Версия" (Version), and "Количество за неделю" (Count for the Week) to each worksheet.
-    6. Queries the database to retrieve data about the count of each robot model/version created in the past week.
-    7. Populates each worksheet with the retrieved data.
-    8. Removes the default "Sheet" from the workbook.
-    9. Prepares an HTTP response with the appropriate content type for an Excel file.
-    10. Sets the content disposition header to specify the filename for the generated Excel report.
-    11. Saves the workbook to the response content.
-    12. Returns the HTTP response with the generated Excel report as an attachment.
+    1. Serves the weekly report ending today rendered by the report worker, queued every
+       day at `WEEKLY_REPORT_TIME` by the `schedule_weekly_report` command, so repeat
+       downloads are plain file reads. Its ETag and Last-Modified headers let clients
+       revalidate it with a 304 response. Reports of earlier weeks are never served.
+    2. If today's report has not been rendered yet, determines the current day as `end_date` and
+       `start_date` as 6 days before it, so the report covers the last 7 calendar days
+       including today.
+    3. Sums the daily production rollup over that range per model and version with a single
+       `GROUP BY model, version` query, so the cost depends on the number of days and models
+       rather than on the number of robots ever produced.
+    4. Writes the rows to a write-only `openpyxl` workbook, one worksheet per model, with
+       headers "Модель" (Model), "Версия" (Version) and "Количество за неделю" (Count for the Week).
+    5. Saves the workbook into a spooled temporary file, so memory use does not grow with
+       the number of models and versions.
+    6. Streams the file back as an attachment named after the reported date range.
 
     Example Usage:
-    This view is typically accessed via an HTTP request, such as a GET request. When accessed, it generates a weekly
+    This view is typically accessed via an HTTP request, such as a GET request. When accessed, it returns a weekly
     report that provides insights into the number of robot models and versions created during the past week.
     """
 
-    wb = Workbook()
+    with_demand = request.GET.get("demand") == "1"
+    job = None if with_demand else get_latest_weekly_report()
+    if job is not None:
+        try:
+            return report_job_response(request, job)
+        except FileNotFoundError:
+            pass
+
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=6)
 
-    end_date = datetime.now()  # Current datetime
-    start_date = end_date - timedelta(days=7)  # 7 days before current datetime
-    unique_models = Robot.objects.values_list("model", flat=True).distinct()
-    for model in unique_models:
-        ws = wb.create_sheet(title=model)
+    rows = get_production_summary(start_date, end_date)
+    demand = get_demand() if with_demand else None
+    return FileResponse(
+        render_report_file(rows, demand=demand),
+        as_attachment=True,
+        filename=f"report {start_date}_{end_date}.xlsx",
+        content_type=XLSX_CONTENT_TYPE,
+    )
 
-        ws["A1"] = "Модель"
-        ws["B1"] = "Версия"
-        ws["C1"] = "Количество за неделю"
 
-        model_version_data = (
-            Robot.objects.filter(model=model)
-            .filter(created__range=(start_date, end_date))
-            .values("model", "version")
-            .annotate(count_for_week=Count("version"))
-            .order_by("model", "version")
-        )
+def get_production_report(request) -> HttpResponse:
+    """
+    View function for a production report over an arbitrary range of days.
 
-        for i, data in enumerate(
-            model_version_data, start=2
-        ):  # Start from row 2, assuming headers in row 1
-            ws.cell(row=i, column=1, value=data["model"])
-            ws.cell(row=i, column=2, value=data["version"])
-            ws.cell(row=i, column=3, value=data["count_for_week"])
-    default_sheet = wb["Sheet"]
-    wb.remove(default_sheet)
-
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    Query parameters:
+        start (str): The first day of the range, ``YYYY-MM-DD``.
+        end (str): The last day of the range, ``YYYY-MM-DD``.
+        model (str, optional): Only report this model; may be repeated.
+        format (str, optional): ``xlsx`` (default), ``csv`` or ``json``.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered report, served from the cache when possible.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    missing_fields = validate_json_data(request.GET, {"start", "end"})
+    if missing_fields:
+        missing_fields_list = ", ".join(sorted(missing_fields))
+        response = {"message": f"Missing required query parameter(s): {missing_fields_list}"}
+        return JsonResponse(response, status=400)
+
+    try:
+        start_date = date.fromisoformat(request.GET["start"])
+        end_date = date.fromisoformat(request.GET["end"])
+    except ValueError:
+        response = {"message": "Dates must be in YYYY-MM-DD format."}
+        return JsonResponse(response, status=400)
+
+    if start_date > end_date:
+        response = {"message": "The start date must not be after the end date."}
+        return JsonResponse(response, status=400)
+
+    report_format = request.GET.get("format", "xlsx")
+    if report_format not in REPORT_CONTENT_TYPES:
+        formats = ", ".join(REPORT_CONTENT_TYPES)
+        response = {"message": f"Unsupported format, expected one of: {formats}"}
+        return JsonResponse(response, status=400)
+
+    models = sorted(set(request.GET.getlist("model")))
+    content = get_cached_report(start_date, end_date, models, report_format)
+
+    response = HttpResponse(content, content_type=REPORT_CONTENT_TYPES[report_format])
+    if report_format != "json":
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="report {start_date}_{end_date}.{report_format}"'
+    return response
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+def post_report_job(request) -> JsonResponse:
+    """
+    View function for queueing a production report to be rendered in the background.
+
+    The JSON body holds ``start`` and ``end`` (``YYYY-MM-DD``), and optionally
+    ``models`` (a list) and ``format`` (``xlsx``, ``csv`` or ``json``).
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        JsonResponse: 202 with the id of the queued job, or an error response.
+    """
+    if request.method != "POST":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    try:
+        data = loads(request.body)
+    except json.JSONDecodeError:
+        response = {"message": "Invalid JSON format in the request body."}
+        return JsonResponse(response, status=400)
+
+    if not isinstance(data, dict):
+        response = {"message": "Item must be a JSON object."}
+        return JsonResponse(response, status=400)
+
+    missing_fields = validate_json_data(data, {"start", "end"})
+    if missing_fields:
+        missing_fields_list = ", ".join(sorted(missing_fields))
+        response = {
+            "message": f"Missing required field(s) in JSON data: {missing_fields_list}"
+        }
+        return JsonResponse(response, status=400)
+
+    try:
+        start_date = date.fromisoformat(data["start"])
+        end_date = date.fromisoformat(data["end"])
+    except (TypeError, ValueError):
+        response = {"message": "Dates must be in YYYY-MM-DD format."}
+        return JsonResponse(response, status=400)
+
+    if start_date > end_date:
+        response = {"message": "The start date must not be after the end date."}
+        return JsonResponse(response, status=400)
+
+    report_format = data.get("format", ReportJob.Format.XLSX)
+    if report_format not in ReportJob.Format.values:
+        formats = ", ".join(ReportJob.Format.values)
+        response = {"message": f"Unsupported format, expected one of: {formats}"}
+        return JsonResponse(response, status=400)
+
+    models = data.get("models", [])
+    if not isinstance(models, list) or not all(isinstance(m, str) for m in models):
+        response = {"message": "models must be a list of model names."}
+        return JsonResponse(response, status=400)
+
+    job = ReportJob.objects.create(
+        start_date=start_date,
+        end_date=end_date,
+        robot_models=sorted(set(models)),
+        format=report_format,
     )
-    response[
-        "Content-Disposition"
-    ] = f"attachment; filename=report {start_date.date()}_{end_date.date()}.xlsx"
+    response = {"message": f"Report job queued with id: {job.id}", "id": job.id}
+    return JsonResponse(response, status=202)
+
 
-    # Save the workbook to the response content
-    wb.save(response)
+def get_report_job(request, job_id) -> JsonResponse:
+    """
+    View function for the status of a report job.
 
+    Args:
+        request (HttpRequest): The HTTP request object.
+        job_id (int): The id of the job.
+
+    Returns:
+        JsonResponse: The status of the job, with its download link once rendered.
+    """
+
+    job = ReportJob.objects.filter(id=job_id).first()
+    if job is None:
+        response = {"message": "There isn't report job with such id"}
+        return JsonResponse(response, status=404)
+
+    response = {"id": job.id, "status": job.status, "error": job.error}
+    if job.status == ReportJob.Status.DONE:
+        response["download"] = f"/api/reports/jobs/{job.id}/download/"
+    return JsonResponse(response)
+
+
+def download_report_job(request, job_id) -> HttpResponse:
+    """
+    View function for downloading the file of a rendered report job.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        job_id (int): The id of the job.
+
+    Returns:
+        HttpResponse: The file, a 304 response, or 404 if it is not rendered.
+    """
+
+    job = ReportJob.objects.filter(id=job_id, status=ReportJob.Status.DONE).first()
+    if job is not None:
+        try:
+            return report_job_response(request, job)
+        except FileNotFoundError:
+            pass
+
+    response = {"message": "The report is not rendered yet."}
+    return JsonResponse(response, status=404)
+
+
+def get_availability_keys(request) -> set:
+    return subscription_keys(request.GET.getlist("serial"), request.GET.getlist("model"))
+
+
+async def availability_stream(keys):
+    """
+    Yield server-sent events for robots in stock and produced while the client listens.
+
+    The stream opens with an ``available`` event per serial already in stock
+    and ends after ``AVAILABILITY_STREAM_TIMEOUT`` seconds; clients such as
+    ``EventSource`` reconnect on their own.
+    """
+
+    subscription = broker.subscribe(keys)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.AVAILABILITY_STREAM_TIMEOUT
+    try:
+        yield "retry: 1000\n\n"
+        for event in await run_blocking(stock_events, keys):
+            yield f"event: available\ndata: {json.dumps(event)}\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=min(settings.AVAILABILITY_KEEPALIVE, remaining),
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: available\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def stream_availability(request) -> HttpResponse:
+    """
+    View function for a server-sent events stream of newly produced robots.
+
+    Needs an ASGI server: every open stream only holds an entry in the
+    in-process broker, no thread and no database connection.
+
+    Query parameters:
+        serial (str, optional): Listen for this serial; may be repeated.
+        model (str, optional): Listen for this model; may be repeated.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: A ``text/event-stream`` response with an ``available``
+        event per serial in stock and per serial produced, or an error response.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    if not isinstance(request, ASGIRequest):
+        response = {"message": "The availability stream needs an ASGI server."}
+        return JsonResponse(response, status=400)
+
+    keys = get_availability_keys(request)
+    if not keys:
+        response = {"message": "Missing query parameter(s): serial or model"}
+        return JsonResponse(response, status=400)
+
+    start_listener()
+    response = StreamingHttpResponse(
+        availability_stream(keys), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
     return response
+
+
+@latency_budget(None)
+async def poll_availability(request) -> HttpResponse:
+    """
+    View function for long-polling newly produced robots.
+
+    Query parameters:
+        serial (str, optional): Wait for this serial; may be repeated.
+        model (str, optional): Wait for this model; may be repeated.
+        timeout (float, optional): Seconds to wait, at most ``AVAILABILITY_POLL_TIMEOUT``.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The serials in stock right away, otherwise the events as
+        soon as there are any, 204 if the timeout passed without any, or an
+        error response.
+    """
+    if request.method != "GET":
+        response = {"message": "Invalid request."}
+        return JsonResponse(response, status=400)
+
+    keys = get_availability_keys(request)
+    if not keys:
+        response = {"message": "Missing query parameter(s): serial or model"}
+        return JsonResponse(response, status=400)
+
+    try:
+        timeout = float(request.GET.get("timeout", settings.AVAILABILITY_POLL_TIMEOUT))
+    except ValueError:
+        response = {"message": "timeout must be a number."}
+        return JsonResponse(response, status=400)
+    timeout = min(max(timeout, 0), settings.AVAILABILITY_POLL_TIMEOUT)
+
+    start_listener()
+    subscription = broker.subscribe(keys)
+    try:
+        events = await run_blocking(stock_events, keys)
+        if not events:
+            events = [await asyncio.wait_for(subscription.queue.get(), timeout)]
+    except asyncio.TimeoutError:
+        return HttpResponse(status=204)
+    finally:
+        broker.unsubscribe(subscription)
+
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return JsonResponse({"events": events})